@@ -0,0 +1,63 @@
+"""
+micro-benchmark of `OneRow.from_text`
+
+Examples:
+    $ python benchmark/bench_one_row.py --lines 200000
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+import mojimoji
+
+# ベンチマーク対象のファイルへのパスを通している
+SOURCE_PATH = os.path.abspath(os.path.dirname(os.path.abspath(__file__))).rsplit("/", 1)[0]
+sys.path.append(f"{SOURCE_PATH}")
+
+from pyargent.entity.credit_card import OneRow  # noqa: E402
+
+SAMPLE_LINES = [
+    "2021/01/05,AMAZON CO JP,1280,1,1,1280,\n",
+    "2021/01/06,ＳＥＶＥＮ－ＥＬＥＶＥＮ　ＳＨＩＮＪＵＫＵ,540,1,1,540,\n",
+    "2021/01/07,ｽｰﾊﾟｰﾏｰｹｯﾄ,3210,1,1,3210,ﾒﾓ\n",
+    "2021/01/08,東京電力　電気料金,7120,1,1,7120,\n",
+    "ご利用日,ご利用店名,ご利用金額,支払区分,,今回ご請求額,備考\n",
+]
+
+
+def legacy_from_text(text: str):
+    """`OneRow.from_text` before the parser was precompiled"""
+    pattern = ",".join(OneRow.PATTERN_LIST_1)
+    table = str.maketrans({"　": "", " ": "", "\t": "", "\n": "", "－": "ー", "−": "ー", "―": "ー"})
+    _text = text.translate(table)
+    _text = mojimoji.zen_to_han(_text, kana=False)
+    _text = mojimoji.han_to_zen(_text, digit=False, ascii=False)
+    result = re.match(pattern, _text)
+    if result:
+        return OneRow(**result.groupdict())
+    return None
+
+
+def lines_per_second(func, lines) -> float:
+    start = time.perf_counter()
+    for line in lines:
+        func(line)
+    return len(lines) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, default=100_000)
+    args = parser.parse_args()
+
+    lines = [SAMPLE_LINES[i % len(SAMPLE_LINES)] for i in range(args.lines)]
+    before = lines_per_second(legacy_from_text, lines)
+    after = lines_per_second(OneRow.from_text, lines)
+    print(f"before: {before:,.0f} lines/s")
+    print(f"after : {after:,.0f} lines/s ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
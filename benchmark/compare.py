@@ -0,0 +1,44 @@
+"""
+compares two results of `benchmark/run.py`; exits with 1 on regression
+
+Examples:
+    $ python benchmark/compare.py benchmark/results/baseline.json benchmark/results/current.json --threshold 1.2
+"""
+import argparse
+import json
+import sys
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=1.2, help="allowed slowdown ratio")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    if baseline["meta"]["scale"] != current["meta"]["scale"]:
+        print(f"warning: scale differs {baseline['meta']['scale']} != {current['meta']['scale']}")
+
+    regression_list = []
+    print(f"{'[name]':<32} {'[baseline]':>12} {'[current]':>12} {'[ratio]':>8}")
+    for name, base in baseline["results"].items():
+        if name not in current["results"]:
+            continue
+        cur = current["results"][name]
+        ratio = cur / base if base else float("inf")
+        mark = " !" if ratio > args.threshold else ""
+        print(f"{name:<32} {base:>12.4f} {cur:>12.4f} {ratio:>8.2f}{mark}")
+        if ratio > args.threshold:
+            regression_list.append(name)
+
+    if regression_list:
+        print(f"regression: {', '.join(regression_list)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+synthetic data for the benchmark suite
+"""
+import os
+import random
+from typing import List
+
+from pyargent.entity.salary import Salary
+
+HEADER = "ご利用日,ご利用店名,ご利用金額,支払区分,,今回ご請求額,備考\n"
+DESCRIPTION_LIST = [
+    "セブン－イレブン　新宿店",
+    "セブン－イレブン　渋谷店",
+    "ＡＭＡＺＯＮ　ＣＯ　ＪＰ",
+    "AMAZON PRIME",
+    "ｽｰﾊﾟｰﾏｰｹｯﾄ",
+    "スーパーマーケット　本店",
+    "東京電力　電気料金",
+    "JR EAST",
+    "JR EAST MOBILE SUICA",
+    "ファミリーマート　駅前",
+]
+COMMENT_LIST = ["", "", "", "備考 あり", "ﾒﾓ"]
+
+
+def write_statements(out_dir: str, files: int, rows_per_file: int, seed: int = 0) -> List[str]:
+    """
+    Writes `files` monthly cp932 statements of `rows_per_file` rows each.
+
+    Returns:
+        written file paths, in month order
+    """
+    rnd = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+    file_path_list = []
+    for i in range(files):
+        year, month = 2000 + i // 12, i % 12 + 1
+        file_path = f"{out_dir}/{year}{month:02d}.csv"
+        with open(file_path, mode="w", encoding="cp932") as f:
+            f.write(HEADER)
+            for _ in range(rows_per_file):
+                billing = rnd.randint(-1000, 20000)
+                description = rnd.choice(DESCRIPTION_LIST)
+                comment = rnd.choice(COMMENT_LIST)
+                f.write(f"{year}/{month:02d}/{rnd.randint(1, 28):02d},{description},{billing},1,1,{billing},{comment}\n")
+            f.write("合計,,,,,0,\n")
+        file_path_list.append(file_path)
+    return file_path_list
+
+
+def generate_salaries(months: int, companies: int = 1, seed: int = 0) -> List[Salary]:
+    """
+    Returns:
+        `months` x `companies` payslips
+    """
+    rnd = random.Random(seed)
+    salary_list = []
+    for i in range(months):
+        year, month = 2000 + i // 12, i % 12 + 1
+        for c in range(companies):
+            salary_list.append(
+                Salary.of(
+                    company=f"company{c}",
+                    payment_date=f"{year}-{month:02d}-25",
+                    calc_start_date=f"{year}-{month:02d}-01",
+                    calc_end_date=f"{year}-{month:02d}-28",
+                    basic_payment=rnd.randint(200_000, 600_000),
+                    overtime_fee=rnd.randint(0, 100_000),
+                    static_overtime_fee=rnd.randint(0, 50_000),
+                    commuting_fee=rnd.randint(0, 30_000),
+                    additional_allowance=rnd.randint(0, 20_000),
+                    health_insurance=rnd.randint(10_000, 30_000),
+                    nursing_insurance=rnd.randint(0, 5_000),
+                    welfare_pension=rnd.randint(20_000, 60_000),
+                    pension_fund=rnd.randint(0, 10_000),
+                    employment_insurance=rnd.randint(1_000, 3_000),
+                    income_tax=rnd.randint(5_000, 40_000),
+                    inhabitant_tax=rnd.randint(5_000, 40_000),
+                    year_end_tax_adjustment=0,
+                )
+            )
+    return salary_list
@@ -0,0 +1,68 @@
+"""
+checks the import time of pyargent with `python -X importtime`; exits with 1 on regression
+
+heavy dependencies (pandas, s3fs, injector, ...) must be loaded only when they are used
+
+Examples:
+    $ python benchmark/import_time.py --budget-ms 150
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+SOURCE_PATH = os.path.abspath(os.path.dirname(os.path.abspath(__file__))).rsplit("/", 1)[0]
+
+MODULE_LIST = ["pyargent", "pyargent.entity.credit_card", "pyargent.entity.salary", "pyargent.infrastructure"]
+FORBIDDEN_LIST = ["pandas", "numpy", "s3fs", "botocore", "aiobotocore", "fsspec", "injector"]
+
+
+def import_time(module: str) -> Dict[str, int]:
+    """
+    Returns:
+        cumulative import time [us] of each module imported by `import <module>`
+    """
+    code = f"import {module}"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SOURCE_PATH,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    cumulative_dict = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        # import time: self [us] | cumulative | imported package
+        _, cumulative, name = line.split("|")
+        cumulative_dict[name.strip()] = int(cumulative)
+    return cumulative_dict
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=150.0, help="allowed cumulative time of each module")
+    args = parser.parse_args()
+
+    error_list: List[str] = []
+    print(f"{'[module]':<32} {'[ms]':>8}")
+    for module in MODULE_LIST:
+        cumulative_dict = import_time(module)
+        elapsed = cumulative_dict[module] / 1000
+        mark = " !" if elapsed > args.budget_ms else ""
+        print(f"{module:<32} {elapsed:>8.1f}{mark}")
+        if elapsed > args.budget_ms:
+            error_list.append(f"{module} takes {elapsed:.1f} ms")
+        loaded_list = [name for name in FORBIDDEN_LIST if name in cumulative_dict]
+        if loaded_list:
+            error_list.append(f"{module} imports {', '.join(loaded_list)}")
+
+    if error_list:
+        print(f"regression: {'; '.join(error_list)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+benchmark suite of the credit-card and salary pipelines
+
+Examples:
+    $ python benchmark/run.py --files 24 --rows 2000 --output benchmark/results/current.json
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+# ベンチマーク対象のファイルへのパスを通している
+SOURCE_PATH = os.path.abspath(os.path.dirname(os.path.abspath(__file__))).rsplit("/", 1)[0]
+sys.path.append(f"{SOURCE_PATH}")
+
+from generate import generate_salaries, write_statements  # noqa: E402
+from pyargent.entity.credit_card import OneFile, OneRow  # noqa: E402
+from pyargent.entity.salary import Salary  # noqa: E402
+from pyargent.infrastructure import SalaryLocal  # noqa: E402
+
+
+def best_of(func: Callable, repeat: int) -> float:
+    """
+    Returns:
+        the fastest of `repeat` runs, in seconds
+    """
+    elapsed_list = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed_list.append(time.perf_counter() - start)
+    return min(elapsed_list)
+
+
+def run(files: int, rows: int, months: int, companies: int, repeat: int) -> Dict[str, float]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # credit card
+        file_path_list = write_statements(f"{tmp_dir}/statement", files=files, rows_per_file=rows)
+        with open(file_path_list[0], mode="r", encoding="cp932") as f:
+            line_list = f.readlines()
+        results["OneRow.from_text"] = best_of(lambda: [OneRow.from_text(t) for t in line_list], repeat)
+        results["OneFile.from_file_path_list"] = best_of(lambda: OneFile.from_file_path_list(file_path_list), repeat)
+        results["OneFile.from_file_path_list(use_mmap)"] = best_of(
+            lambda: OneFile.from_file_path_list(file_path_list, use_mmap=True), repeat
+        )
+
+        one_file = OneFile.from_file_path_list(file_path_list)
+        results["OneFile.to_df"] = best_of(lambda: one_file.to_df(), repeat)
+        df = one_file._to_df()
+        results["OneFile._add_group"] = best_of(lambda: OneFile._add_group(df), repeat)
+        # a fresh OneFile per run, so that the spend cube is built every time
+        results["OneFile.to_chart_df"] = best_of(
+            lambda: OneFile(one_row_list=one_file.one_row_list[:]).to_chart_df(), repeat
+        )
+        one_file.to_chart_df()
+        results["OneFile.to_chart_df(cached)"] = best_of(lambda: one_file.to_chart_df(), repeat)
+
+        # salary
+        salary_list = generate_salaries(months=months, companies=companies)
+        data_list = [s.dumps() for s in salary_list]
+        results["Salary.dumps"] = best_of(lambda: [s.dumps() for s in salary_list], repeat)
+        results["Salary.loads"] = best_of(lambda: [Salary.loads(data=d) for d in data_list], repeat)
+
+        local_dir = f"{tmp_dir}/salary"
+        os.makedirs(local_dir)
+        repository = SalaryLocal(prefix=local_dir)
+        results["SalaryLocal.save"] = best_of(lambda: [repository.save(salary=s) for s in salary_list], repeat)
+        dt_list = sorted({s.dt() for s in salary_list})
+        results["SalaryLocal.load"] = best_of(lambda: [repository.load(dt=dt) for dt in dt_list], repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=24, help="number of monthly statements")
+    parser.add_argument("--rows", type=int, default=2000, help="rows per statement")
+    parser.add_argument("--months", type=int, default=120, help="months of payslips")
+    parser.add_argument("--companies", type=int, default=2, help="payslips per month")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="json path; printed to stdout if omitted")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": {"files": args.files, "rows": args.rows, "months": args.months, "companies": args.companies},
+            "repeat": args.repeat,
+        },
+        "results": run(
+            files=args.files, rows=args.rows, months=args.months, companies=args.companies, repeat=args.repeat
+        ),
+    }
+    if args.output is None:
+        print(json.dumps(report, indent=2))
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
-from dataclasses import dataclass
-from typing import List, Optional
-from injector import Injector, inject
-
-from pyargent.entity.salary import Salary, SalaryTax, SalaryPayment, SalaryDeduction, SalaryRepository
-from .di_container import DiS3, DiLocal
+from pyargent.entity.salary import (
+    Salary,
+    SalaryTax,
+    SalaryPayment,
+    SalaryDeduction,
+    SalaryRepository,
+    AsyncSalaryRepository,
+)
 
 
 # comparable tuple
@@ -11,26 +13,20 @@ VERSION = (0, 1, 0)
 # generate __version__ via VERSION tuple
 __version__ = ".".join(map(str, VERSION))
 
-__all__ = ["py_argent"]
-
+__all__ = ["py_argent", "async_py_argent"]
 
-@inject
-@dataclass
-class PyArgent:
-    salary_repository: SalaryRepository
+# injector・s3fs・pandasなどは、使うときに読み込む
+_FACADE_ATTRIBUTES = ["PyArgent", "AsyncPyArgent", "py_argent", "async_py_argent"]
+_DI_CONTAINER_ATTRIBUTES = ["DiS3", "DiLocal", "DiParquet"]
 
-    def save_salary(self, salary: Salary) -> str:
-        return self.salary_repository.save(salary=salary)
 
-    def load_salary(self, dt: str) -> List[Salary]:
-        return self.salary_repository.load(dt=dt)
+def __getattr__(name: str):
+    if name in _FACADE_ATTRIBUTES:
+        from . import facade
 
+        return getattr(facade, name)
+    if name in _DI_CONTAINER_ATTRIBUTES:
+        from . import di_container
 
-def py_argent(storage: str, prefix: str, s3_bucket: Optional[str] = None) -> PyArgent:
-    if storage == "s3":
-        di = Injector([DiS3(s3_bucket=s3_bucket, prefix=prefix)])
-    elif storage == "local":
-        di = Injector([DiLocal(prefix=prefix)])
-    else:
-        raise ValueError()
-    return di.get(PyArgent)
+        return getattr(di_container, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
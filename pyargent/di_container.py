@@ -1,10 +1,13 @@
+import importlib.util
+from typing import Optional
+
 from injector import Module, Binder
 
 # interface
-from pyargent.entity.salary import SalaryRepository
+from pyargent.entity.salary import AsyncSalaryRepository, SalaryRepository
 
 # external
-from pyargent.infrastructure import SalaryLocal, SalaryS3
+from pyargent.infrastructure import AsyncSalaryAdapter, AsyncSalaryS3, ReadCache, S3Config, SalaryLocal, SalaryS3
 
 
 class DiS3(Module):
@@ -13,15 +16,46 @@ class DiS3(Module):
 
     Args:
         s3_bucket: データ保存に利用するのS3バケットの名前
+        max_concurrency: 読み込み時に同時に取得するオブジェクトの上限
+        s3_config: 接続プールの大きさ・再試行・タイムアウト
+        read_cache: 読み込んだ給与を保持するキャッシュ
     """
 
-    def __init__(self, s3_bucket: str, prefix: str):
+    def __init__(
+        self,
+        s3_bucket: str,
+        prefix: str,
+        max_concurrency: int = 32,
+        s3_config: Optional[S3Config] = None,
+        read_cache: Optional[ReadCache] = None,
+    ):
         self.s3_bucket = s3_bucket
         self.prefix = prefix
+        self.max_concurrency = max_concurrency
+        self.s3_config = s3_config or S3Config()
+        self.read_cache = read_cache
 
     def configure(self, binder: Binder) -> None:
         # データの保存とか
-        binder.bind(SalaryRepository, SalaryS3(s3_bucket=self.s3_bucket, prefix=self.prefix))
+        binder.bind(
+            SalaryRepository,
+            SalaryS3(
+                s3_bucket=self.s3_bucket,
+                prefix=self.prefix,
+                max_concurrency=self.max_concurrency,
+                config=self.s3_config,
+                read_cache=self.read_cache,
+            ),
+        )
+        binder.bind(
+            AsyncSalaryRepository,
+            AsyncSalaryS3(
+                s3_bucket=self.s3_bucket,
+                prefix=self.prefix,
+                max_concurrency=self.max_concurrency,
+                config=self.s3_config,
+            ),
+        )
 
 
 class DiLocal(Module):
@@ -35,4 +69,30 @@ class DiLocal(Module):
 
     def configure(self, binder: Binder) -> None:
         # データの保存とか
-        binder.bind(SalaryRepository, SalaryLocal(prefix=self.prefix))
+        salary_local = SalaryLocal(prefix=self.prefix)
+        binder.bind(SalaryRepository, salary_local)
+        binder.bind(AsyncSalaryRepository, AsyncSalaryAdapter(repository=salary_local))
+
+
+class DiParquet(Module):
+    """
+    DIコンテナ
+
+    Args:
+        prefix: ローカルのパス、または`s3://bucket/prefix`
+    """
+
+    def __init__(self, prefix: str):
+        self.prefix = prefix
+
+    def configure(self, binder: Binder) -> None:
+        # pyarrowはextrasなので、最初の保存で失敗する前に確認する
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("storage='parquet' requires pyarrow: pip install 'pyargent[parquet]'")
+        # pandasを読み込むので、選ばれたときだけ読み込む
+        from pyargent.infrastructure.salary_parquet import SalaryParquet
+
+        # データの保存とか
+        salary_parquet = SalaryParquet(prefix=self.prefix)
+        binder.bind(SalaryRepository, salary_parquet)
+        binder.bind(AsyncSalaryRepository, AsyncSalaryAdapter(repository=salary_parquet))
@@ -1,2 +1,7 @@
 from .one_row import OneRow
 from .one_file import OneFile
+from .merchant_group import MerchantGroupCache
+from .parse_cache import ParseCache
+from .one_row_store import OneRowStore
+from .spend_cube import SpendCube
+from .row_filter import RowFilter
@@ -0,0 +1,151 @@
+from dataclasses import dataclass, field
+import json
+import os
+from os.path import commonprefix
+import tempfile
+from typing import TYPE_CHECKING, Dict, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# descriptions sharing the first characters belong to the same merchant
+PREFIX_LENGTH = 4
+
+
+@dataclass
+class MerchantGroupCache:
+    """
+    On-disk `prefix -> group` dictionary, reused across runs.
+
+    The stored label is the common prefix of every description ever seen for the prefix,
+    so a run only compares its own descriptions against it, and labels do not depend on
+    which statements happen to be loaded.
+
+    Examples:
+        >>> import glob
+        >>> from pyargent.entity.credit_card import OneFile, MerchantGroupCache
+        >>> cache = MerchantGroupCache.load("./data/merchant_group.json")
+        >>> df = OneFile.from_file_path_list(glob.glob("./data/*.csv")).to_df(group_cache=cache)
+    """
+
+    path: str
+    groups: Dict[str, str] = field(default_factory=dict, repr=False)
+    updated: bool = field(default=False, repr=False, compare=False)
+
+    # bump when the grouping rule changes, to discard old caches
+    VERSION = 1
+
+    @staticmethod
+    def load(path: str) -> "MerchantGroupCache":
+        """
+        Args:
+            path: json file path; missing, unreadable or outdated files give an empty cache
+
+        Returns:
+
+        """
+        if not os.path.exists(path):
+            return MerchantGroupCache(path=path)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return MerchantGroupCache(path=path, updated=True)
+        if not isinstance(data, dict) or data.get("version") != MerchantGroupCache.VERSION or data.get("prefix_length") != PREFIX_LENGTH:
+            return MerchantGroupCache(path=path, updated=True)
+        return MerchantGroupCache(path=path, groups=data["groups"])
+
+    def save(self):
+        """
+        Writes the cache if it has changed; the file is replaced atomically.
+        """
+        if not self.updated:
+            return
+        data = {"version": self.VERSION, "prefix_length": PREFIX_LENGTH, "groups": self.groups}
+        # a temporary file per writer, so that concurrent saves never share one
+        directory, file_name = os.path.split(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{file_name}.", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.updated = False
+
+    def invalidate(self):
+        """
+        Forgets every label; they are rebuilt from the next loaded statements.
+        """
+        self.groups = {}
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.updated = False
+
+    def merge(self, prefix: str, label: str) -> str:
+        """
+        Args:
+            prefix: first `PREFIX_LENGTH` characters of the descriptions
+            label: common prefix of the descriptions in this run
+
+        Returns:
+            label shared with the previous runs
+        """
+        known = self.groups.get(prefix)
+        if known is not None:
+            label = commonprefix([known, label])
+        if label != known:
+            self.groups[prefix] = label
+            self.updated = True
+        return label
+
+
+def group_by_prefix(description: "pd.Series", group_cache: Optional[MerchantGroupCache] = None) -> "pd.Series":
+    """
+    Labels each description with the longest common prefix of all descriptions
+    sharing its first `PREFIX_LENGTH` characters.
+
+    Each distinct description is labelled once. The common prefix of a set of strings
+    is the common prefix of its min and max, so only two strings are compared per new merchant;
+    a merchant already in `group_cache` only compares the descriptions outside its stored label.
+
+    Args:
+        description: `description` column
+        group_cache: if set, labels are merged with, and stored to, the cache
+
+    Returns:
+        `group` column, aligned with `description`
+
+    Examples:
+        >>> group_by_prefix(pd.Series(["some_string_4214", "some_string_9951", "other"]))
+        0    some_string_
+        1    some_string_
+        2           other
+        Name: group, dtype: object
+    """
+    import numpy as np
+    import pandas as pd
+
+    codes, unique = pd.factorize(description, sort=False)
+    unique = pd.Series(unique, dtype=object)
+    prefix = unique.str[:PREFIX_LENGTH]
+
+    label_dict: Dict[str, str] = {}
+    new_mask = np.ones(len(unique), dtype=bool)
+    if group_cache is not None:
+        for i, (p, d) in enumerate(zip(prefix, unique)):
+            label = label_dict.get(p, group_cache.groups.get(p))
+            if label is None:
+                continue
+            new_mask[i] = False
+            label_dict[p] = label if d.startswith(label) else commonprefix([label, d])
+
+    bounds = unique[new_mask].groupby(prefix[new_mask], sort=False).agg(["min", "max"])
+    label_dict.update((p, commonprefix([lo, hi])) for p, lo, hi in zip(bounds.index, bounds["min"], bounds["max"]))
+    if group_cache is not None:
+        for p, label in label_dict.items():
+            group_cache.merge(p, label)
+        group_cache.save()
+    label_list = np.array([label_dict[p] for p in prefix], dtype=object)
+    return pd.Series(label_list[codes], index=description.index, name="group")
@@ -1,117 +1,361 @@
-from dataclasses import dataclass, field, asdict
-import hashlib
-from typing import List
+import codecs
+import mmap
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
-import pandas as pd
+from pyargent.instrumentation import count, traced
 
-from .one_row import OneRow
+from .merchant_group import MerchantGroupCache, group_by_prefix
+from .one_row import BYTES_ENCODINGS, OneRow
+from .one_row_store import OneRowStore
+from .parse_cache import ParseCache
+from .row_filter import RowFilter
+from .spend_cube import SpendCube
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# file path -> (earliest, latest) date of its rows, or None if unknown
+FileDateRange = Callable[[str], Optional[Tuple[str, str]]]
 
 
 @dataclass(init=True, order=True)
 class OneFile:
     raw_text_list: List[str] = field(default_factory=list, repr=False, compare=False)
-    one_row_list: List[OneRow] = field(default_factory=list, compare=False)
+    one_row_list: OneRowStore = field(default_factory=OneRowStore, compare=False)
+    _spend_cube: Optional[SpendCube] = field(default=None, init=False, repr=False, compare=False)
+    _spend_cube_source: Optional[OneRowStore] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if not isinstance(self.one_row_list, OneRowStore):
+            self.one_row_list = OneRowStore(self.one_row_list)
+
+    def extend(self, one_file: "OneFile") -> "OneFile":
+        """
+        Appends the rows of a newly arrived statement.
+        The spend cube of `to_chart_df()` only aggregates the appended rows.
+
+        Args:
+            one_file: new statement
+
+        Returns:
+            self
+        """
+        self.raw_text_list.extend(one_file.raw_text_list)
+        self.one_row_list.extend(one_file.one_row_list)
+        return self
+
+    def spend_cube(self) -> SpendCube:
+        """
+        Returns:
+            daily totals of the rows, updated with the rows appended since the last call
+        """
+        row_count = len(self.one_row_list)
+        # rebuilt when `one_row_list` was replaced, not only appended to
+        if (
+            self._spend_cube is None
+            or self._spend_cube_source is not self.one_row_list
+            or self._spend_cube.row_count > row_count
+        ):
+            self._spend_cube = SpendCube()
+            self._spend_cube_source = self.one_row_list
+        if self._spend_cube.row_count < row_count:
+            self._spend_cube.update(self.one_row_list[self._spend_cube.row_count :])
+        return self._spend_cube
 
     @staticmethod
-    def from_file_path(file_path: str, encoding="cp932"):
+    @traced
+    def from_file_path(
+        file_path: str,
+        encoding="cp932",
+        keep_raw_text=True,
+        parse_cache: Optional[ParseCache] = None,
+        use_mmap=False,
+        row_filter: Optional[RowFilter] = None,
+        file_date_range: Optional[FileDateRange] = None,
+    ):
+        """
+
+        Args:
+            file_path: path of the statement csv
+            encoding: file encoding
+            keep_raw_text: if False, `raw_text_list` is left empty and lines are parsed one by one
+            parse_cache: if set, rows are reused from the cache while the file is unchanged.
+                raw text is not kept for cached files.
+            use_mmap: if True, the file is memory-mapped and parsed on raw bytes, see `iter_file_path`.
+                raw text is not kept.
+            row_filter: if set, only the matching rows are kept; they are dropped while parsing.
+                the file is skipped without being read when its date range, from `file_date_range`
+                or `parse_cache`, is out of the filter.
+            file_date_range: returns the date range of a file if known, e.g. from its name
+
+        Returns:
+
+        """
+        if row_filter is not None and row_filter.has_date_range():
+            date_range = file_date_range(file_path) if file_date_range is not None else None
+            if date_range is None and parse_cache is not None:
+                date_range = parse_cache.date_range(file_path, encoding)
+            if date_range is not None and not row_filter.overlaps(*date_range):
+                count("OneFile.skipped_files")
+                return OneFile()
+
+        if parse_cache is not None:
+            one_row_list = parse_cache.load(file_path, encoding)
+            count("ParseCache.miss" if one_row_list is None else "ParseCache.hit")
+            if one_row_list is None:
+                # the cache keeps every row, the filter is applied afterwards
+                one_row_list = OneFile.from_file_path(
+                    file_path, encoding, keep_raw_text=False, use_mmap=use_mmap
+                ).one_row_list
+                parse_cache.save(file_path, encoding, one_row_list)
+            if row_filter is not None:
+                one_row_list = row_filter.filter_store(one_row_list)
+            return OneFile(one_row_list=one_row_list)
+
+        if not keep_raw_text or use_mmap:
+            one_rows = OneFile.iter_file_path(file_path, encoding, use_mmap=use_mmap, row_filter=row_filter)
+            return OneFile(one_row_list=OneRowStore(one_rows))
+
         with open(file_path, mode="r", encoding=encoding) as f:
             text_list = [s for s in f.readlines()]
 
-        one_row_list = [OneRow.from_text(t) for t in text_list]
-        one_row_list = [c for c in one_row_list if c is not None]
+        parse = partial(OneRow.parser().parse, row_filter=row_filter)
+        one_row_list = OneRowStore(c for c in map(parse, text_list) if c is not None)
+        OneFile._count_rows(line_count=len(text_list), row_count=len(one_row_list))
         return OneFile(raw_text_list=text_list, one_row_list=one_row_list)
 
     @staticmethod
-    def from_file_path_list(file_path_list: List[str], encoding="cp932"):
-        whole_raw_text_list = []
-        whole_one_row_list = []
+    @traced
+    def from_file_path_list(
+        file_path_list: List[str],
+        encoding="cp932",
+        keep_raw_text=True,
+        workers: Optional[int] = None,
+        parse_cache: Optional[ParseCache] = None,
+        use_mmap=False,
+        row_filter: Optional[RowFilter] = None,
+        file_date_range: Optional[FileDateRange] = None,
+    ):
+        """
+
+        Args:
+            file_path_list: paths of the statement csv
+            encoding: file encoding
+            keep_raw_text: if False, `raw_text_list` is left empty
+            workers: if set, files are parsed in a process pool of `workers` processes.
+                rows are returned in the same order as `file_path_list` either way.
+            parse_cache: if set, only new or changed files are parsed
+            use_mmap: if True, files are memory-mapped and parsed on raw bytes
+            row_filter: if set, only the matching rows are kept, see `from_file_path`
+            file_date_range: returns the date range of a file if known.
+                must be picklable (a module-level function) with `workers`.
+
+        Returns:
 
-        for file_path in file_path_list:
-            one_file = OneFile.from_file_path(file_path, encoding)
+        Examples:
+            >>> import glob
+            >>> from pyargent.entity.credit_card import OneFile
+            >>> one_file = OneFile.from_file_path_list(sorted(glob.glob("./data/*.csv")), workers=16)
+            >>> # statements named like `202104.csv` only hold the rows of that month
+            >>> def file_date_range(file_path):
+            ...     ym = os.path.basename(file_path)[:6]
+            ...     return f"{ym[:4]}/{ym[4:]}/01", f"{ym[:4]}/{ym[4:]}/31"
+            >>> row_filter = RowFilter(start="2021-04")
+            >>> one_file = OneFile.from_file_path_list(
+            ...     sorted(glob.glob("./data/*.csv")), row_filter=row_filter, file_date_range=file_date_range
+            ... )
+        """
+        whole_raw_text_list = []
+        whole_one_row_list = OneRowStore()
+
+        load = partial(
+            OneFile.from_file_path,
+            encoding=encoding,
+            keep_raw_text=keep_raw_text,
+            parse_cache=parse_cache,
+            use_mmap=use_mmap,
+            row_filter=row_filter,
+            file_date_range=file_date_range,
+        )
+        if workers is None or workers <= 1 or len(file_path_list) <= 1:
+            one_file_list = map(load, file_path_list)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # `map` keeps the order of `file_path_list`
+                one_file_list = list(executor.map(load, file_path_list))
+
+        for one_file in one_file_list:
             whole_raw_text_list.extend(one_file.raw_text_list)
             whole_one_row_list.extend(one_file.one_row_list)
         return OneFile(raw_text_list=whole_raw_text_list, one_row_list=whole_one_row_list)
 
-    def _to_df(self) -> pd.DataFrame:
-        replace_dict = {"total_billing": "", "count": "", "num": "", "actual_billing": ""}
-        astype_dict = {"total_billing": "int", "count": "int", "num": "int", "actual_billing": "int"}
-        return pd.DataFrame([asdict(c) for c in self.one_row_list]).replace(replace_dict, "0").astype(astype_dict)
+    @staticmethod
+    def iter_file_path(
+        file_path: str, encoding="cp932", use_mmap=False, row_filter: Optional[RowFilter] = None
+    ) -> Iterator[OneRow]:
+        """
+        Yields `OneRow` line by line, without keeping the raw text.
+
+        Args:
+            file_path: path of the statement csv
+            encoding: file encoding
+            use_mmap: if True, the file is memory-mapped and each line is matched on its raw bytes;
+                only non-ASCII `description` and `comment` are decoded.
+                `encoding` must be one of `BYTES_ENCODINGS`.
+            row_filter: if set, only the matching rows are yielded
+
+        Returns:
+
+        """
+        if use_mmap and codecs.lookup(encoding).name not in BYTES_ENCODINGS:
+            raise ValueError(f"use_mmap does not support encoding {encoding!r}")
+        parser = OneRow.parser()
+        line_count = row_count = 0
+        try:
+            if use_mmap:
+                with open(file_path, mode="rb") as f:
+                    try:
+                        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    except ValueError:
+                        # empty file
+                        return
+                    with buffer:
+                        for line in iter(buffer.readline, b""):
+                            line_count += 1
+                            one_row = parser.parse_bytes(line, encoding, row_filter=row_filter)
+                            if one_row is not None:
+                                row_count += 1
+                                yield one_row
+                return
+
+            with open(file_path, mode="r", encoding=encoding) as f:
+                for text in f:
+                    line_count += 1
+                    one_row = parser.parse(text, row_filter=row_filter)
+                    if one_row is not None:
+                        row_count += 1
+                        yield one_row
+        finally:
+            OneFile._count_rows(line_count=line_count, row_count=row_count)
 
     @staticmethod
-    def _add_group(_df: pd.DataFrame) -> pd.DataFrame:
-        def to_hash(input_str: str) -> str:
-            return hashlib.sha3_256(input_str[:4].encode("cp932")).hexdigest()[:10]
-
-        def get_max_index(same_strings_list: List[str]) -> int:
-            """
-
-            Args:
-                same_strings_list:
-
-            Returns:
-
-            Examples:
-                >>> _input = [
-                >>>     "some_string_4214", "some_string_9951", "some_string_9041"
-                >>> ]
-                >>> get_max_index(_input)
-                len("some_string_")
-
-
-            """
-            max_length = max([len(s) for s in same_strings_list])
-            max_index = 0
-            for i in range(max_length):
-                strings_starts_list = [s[: i + 1] for s in same_strings_list]
-                strings_set = set(strings_starts_list)
-                if len(strings_set) == 1:
-                    max_index = i + 1
-                else:
-                    break
-            return max_index
-
-        def get_max_same_string(same_strings_list: List[str]) -> str:
-            """
-
-            Args:
-                same_strings_list:
-
-            Returns:
-
-            Examples:
-                >>> _input = [
-                >>>     "some_string_4214", "some_string_9951", "some_string_9041"
-                >>> ]
-                >>> get_max_same_string(_input)
-                "some_string_"
-
-            """
-            max_index = get_max_index(same_strings_list)
-            return same_strings_list[0][:max_index]
-
-        # add hash column
-        _df["hash"] = _df["description"].apply(to_hash)
-        hash_dict = {}
-        for _hash, g_df in _df.groupby("hash"):
-            description_list = list(g_df["description"].drop_duplicates().values)
-
-            group = get_max_same_string(description_list)
-            hash_dict[_hash] = {"hash": _hash, "group": group}
-        hash_df = pd.DataFrame.from_dict(hash_dict, orient="index")
-        return pd.merge(_df, hash_df, on="hash", how="inner").drop("hash", axis=1)
+    def _count_rows(line_count: int, row_count: int):
+        count("OneRow.from_text.parsed", row_count)
+        count("OneRow.from_text.rejected", line_count - row_count)
 
     @staticmethod
-    def _df_split_date(_df) -> pd.DataFrame:
-        ymd_df = pd.DataFrame(list(_df["date"].apply(lambda x: x.split("/"))), columns=["year", "month", "day"])
-        _df[["year", "month", "day"]] = ymd_df
+    def iter_file_path_list(
+        file_path_list: Iterable[str],
+        encoding="cp932",
+        batch_size: Optional[int] = None,
+        use_mmap=False,
+        row_filter: Optional[RowFilter] = None,
+    ) -> Iterator[Union[OneRow, List[OneRow]]]:
+        """
+        Streams the rows of the files in order, file by file.
+
+        Args:
+            file_path_list: paths of the statement csv
+            encoding: file encoding
+            batch_size: if set, yields lists of at most `batch_size` rows instead of single rows
+            use_mmap: if True, files are memory-mapped and parsed on raw bytes
+            row_filter: if set, only the matching rows are yielded
+
+        Returns:
+
+        Examples:
+            >>> import glob
+            >>> from pyargent.entity.credit_card import OneFile
+            >>> rows = OneFile.iter_file_path_list(glob.glob("./data/*.csv"))
+            >>> chart_df = OneFile.stream_to_chart_df(rows, rule="M")
+        """
+        one_rows = chain.from_iterable(
+            OneFile.iter_file_path(p, encoding, use_mmap, row_filter=row_filter) for p in file_path_list
+        )
+        if batch_size is None:
+            yield from one_rows
+            return
+        while True:
+            batch = list(islice(one_rows, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    @staticmethod
+    def _iter_batch(one_rows: Iterable[Union[OneRow, List[OneRow]]], batch_size: int) -> Iterator[List[OneRow]]:
+        """
+        Accepts both the single-row and the batched output of `iter_file_path_list`.
+        """
+        batch = []
+        for one_row in one_rows:
+            if isinstance(one_row, list):
+                yield one_row
+                continue
+            batch.append(one_row)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @traced
+    def _to_df(self) -> "pd.DataFrame":
+        return self._rows_to_df(self.one_row_list)
+
+    @staticmethod
+    def _rows_to_df(one_row_list: Iterable[OneRow]) -> "pd.DataFrame":
+        """
+        Builds the DataFrame from the typed columns of `OneRowStore`.
+        """
+        import pandas as pd
+
+        if not isinstance(one_row_list, OneRowStore):
+            one_row_list = OneRowStore(one_row_list)
+        return pd.DataFrame(one_row_list.to_columns())
+
+    @staticmethod
+    @traced
+    def _add_group(_df: "pd.DataFrame", group_cache: Optional[MerchantGroupCache] = None) -> "pd.DataFrame":
+        _df["group"] = group_by_prefix(_df["description"], group_cache=group_cache)
         return _df
 
-    def to_df(self, add_group=True, split_date=True) -> pd.DataFrame:
+    @staticmethod
+    def _parse_date(date: "pd.Series") -> "pd.DatetimeIndex":
+        """
+        Parses each distinct date only once, with the known `OneRow.DATE_FORMAT`.
+        """
+        import pandas as pd
+
+        codes, unique_date = pd.factorize(date)
+        return pd.to_datetime(unique_date, format=OneRow.DATE_FORMAT).take(codes).rename("date")
+
+    @staticmethod
+    @traced
+    def _df_split_date(_df: "pd.DataFrame", date: Optional["pd.DatetimeIndex"] = None) -> "pd.DataFrame":
+        """
+        Adds integer `year`, `month` and `day` columns.
+        """
+        if date is None:
+            date = OneFile._parse_date(_df["date"])
+        _df["year"] = date.year.to_numpy()
+        _df["month"] = date.month.to_numpy()
+        _df["day"] = date.day.to_numpy()
+        return _df
+
+    @traced
+    def to_df(
+        self, add_group=True, split_date=True, group_cache: Optional[MerchantGroupCache] = None
+    ) -> "pd.DataFrame":
         """
 
         Args:
             add_group:
             split_date:
+            group_cache: merchant groups shared across runs
 
         Returns:
 
@@ -121,20 +365,58 @@ class OneFile:
             >>> # set font if MacOS
             >>> df = OneFile.from_file_path_list(glob.glob("./data/*.csv")).to_df()
         """
-        df = self._to_df()
+        return self._complete_df(_df=self._to_df(), add_group=add_group, split_date=split_date, group_cache=group_cache)
+
+    @staticmethod
+    def _complete_df(
+        _df: "pd.DataFrame", add_group: bool, split_date: bool, group_cache: Optional[MerchantGroupCache] = None
+    ) -> "pd.DataFrame":
         if add_group:
-            df = self._add_group(_df=df)
+            _df = OneFile._add_group(_df=_df, group_cache=group_cache)
+        date = OneFile._parse_date(_df["date"])
         if split_date:
-            df = self._df_split_date(_df=df)
-        df.index = pd.to_datetime(df["date"])
-        return df
+            _df = OneFile._df_split_date(_df=_df, date=date)
+        _df.index = date
+        return _df
 
-    def to_chart_df(self, rule="M", date_format="%Y-%m") -> pd.DataFrame:
+    @staticmethod
+    @traced
+    def stream_to_df(
+        one_rows: Iterable[Union[OneRow, List[OneRow]]],
+        add_group=True,
+        split_date=True,
+        batch_size=100_000,
+        group_cache: Optional[MerchantGroupCache] = None,
+    ) -> "pd.DataFrame":
+        """
+        `to_df()` over a stream of rows: only one batch of `OneRow` is alive at a time.
+
+        Args:
+            one_rows: output of `iter_file_path_list`
+            add_group:
+            split_date:
+            batch_size: number of rows converted to a DataFrame at once
+            group_cache: merchant groups shared across runs
+
+        Returns:
+
+        """
+        import pandas as pd
+
+        df_list = [OneFile._rows_to_df(batch) for batch in OneFile._iter_batch(one_rows, batch_size)]
+        df = pd.concat(df_list, ignore_index=True) if df_list else OneFile._rows_to_df([])
+        return OneFile._complete_df(_df=df, add_group=add_group, split_date=split_date, group_cache=group_cache)
+
+    @traced
+    def to_chart_df(
+        self, rule="M", date_format="%Y-%m", group_cache: Optional[MerchantGroupCache] = None
+    ) -> "pd.DataFrame":
         """
 
         Args:
             rule: resampling interval rule, argument for `resample()`
             date_format: X-Axis date format
+            group_cache: merchant groups shared across runs
 
         Returns:
 
@@ -148,12 +430,33 @@ class OneFile:
             >>> shown_description = ["group1", "group2"]
             >>> df.plot.bar(y=shown_description, alpha=0.6, figsize=(12,3), stacked=True)
         """
-        df = self.to_df(split_date=False)
-        df = (
-            df.pivot_table(index=df.index, columns="group", values="actual_billing", aggfunc=sum)
-            .fillna(0)
-            .resample(rule=rule)
-            .sum()
-        )
-        df.index = [d.strftime(date_format) for d in df.index]
-        return df
+        return self.spend_cube().to_chart_df(rule=rule, date_format=date_format, group_cache=group_cache)
+
+    @staticmethod
+    @traced
+    def stream_to_chart_df(
+        one_rows: Iterable[Union[OneRow, List[OneRow]]],
+        rule="M",
+        date_format="%Y-%m",
+        batch_size=100_000,
+        group_cache: Optional[MerchantGroupCache] = None,
+    ) -> "pd.DataFrame":
+        """
+        `to_chart_df()` over a stream of rows.
+        Each batch is added to a `SpendCube`, so memory is bounded
+        by the number of distinct (date, description) pairs, not by the number of rows.
+
+        Args:
+            one_rows: output of `iter_file_path_list`
+            rule: resampling interval rule, argument for `resample()`
+            date_format: X-Axis date format
+            batch_size: number of rows reduced at once
+            group_cache: merchant groups shared across runs
+
+        Returns:
+
+        """
+        spend_cube = SpendCube()
+        for batch in OneFile._iter_batch(one_rows, batch_size):
+            spend_cube.update(batch)
+        return spend_cube.to_chart_df(rule=rule, date_format=date_format, group_cache=group_cache)
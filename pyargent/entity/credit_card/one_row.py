@@ -1,8 +1,24 @@
 from dataclasses import dataclass
-from dataclasses import field
+from dataclasses import field, fields
+from functools import lru_cache
 import re
+from typing import TYPE_CHECKING, Optional, Sequence, Type
+
 import mojimoji
 
+from pyargent.instrumentation import count
+
+if TYPE_CHECKING:
+    from .row_filter import RowFilter
+
+
+# encodings whose multibyte characters never contain ASCII bytes below 0x40,
+# which `OneRowParser.parse_bytes()` can split without decoding
+BYTES_ENCODINGS = {"cp932", "shift_jis", "utf-8"}
+
+# characters removed / unified before matching
+FORMAT_TABLE = str.maketrans({"\u3000": "", " ": "", "\t": "", "\n": "", "－": "ー", "−": "ー", "―": "ー"})
+
 
 @dataclass(init=True, order=True)
 class OneRow:
@@ -14,6 +30,9 @@ class OneRow:
     actual_billing: int = field(default_factory=int, compare=False)
     comment: str = field(default_factory=str, compare=False)
 
+    # format of `date`, guaranteed by `DATE`
+    DATE_FORMAT = "%Y/%m/%d"
+
     # candidate pattern regex
     DATE = r"(?P<date>[0-9]{4}/[0-9]{2}/[0-9]{2})"
     DESCRIPTION = r"(?P<description>[^,.]+?)"
@@ -26,17 +45,136 @@ class OneRow:
     PATTERN_LIST_1 = [DATE, DESCRIPTION, TOTAL_BILLING, COUNT, NUM, ACTUAL_BILLING, COMMENT]
 
     @classmethod
-    def from_text(cls, text: str):
-        pattern = ",".join(cls.PATTERN_LIST_1)
-        result = re.match(pattern, cls.format_str(text))
-        if result:
-            return OneRow(**result.groupdict())
-        return None
+    def parser(cls) -> "OneRowParser":
+        """
+        Returns the parser for `PATTERN_LIST_1`, built only once.
+        """
+        return OneRowParser.of(row_cls=cls, pattern_list=tuple(cls.PATTERN_LIST_1))
+
+    @classmethod
+    def from_text(cls, text: str, row_filter: Optional["RowFilter"] = None):
+        one_row = cls.parser().parse(text, row_filter=row_filter)
+        count("OneRow.from_text.parsed" if one_row is not None else "OneRow.from_text.rejected")
+        return one_row
 
     @staticmethod
     def format_str(text: str) -> str:
-        table = str.maketrans({"\u3000": "", " ": "", "\t": "", "\n": "", "－": "ー", "−": "ー", "―": "ー"})
-        _text = text.translate(table)
+        return OneRowParser.normalize(text)
+
+
+class OneRowParser:
+    """
+    Precompiled parser of one statement line.
+
+    Holds the compiled regex of a pattern set, so that parsing a line only costs
+    `translate()`, the mojimoji normalisation and one `match()`.
+
+    Examples:
+        >>> parser = OneRowParser.of(row_cls=OneRow, pattern_list=tuple(OneRow.PATTERN_LIST_1))
+        >>> parser.parse("2021/01/05,AMAZON,1000,1,,1000,\\n")
+        OneRow(date='2021/01/05', description='AMAZON', total_billing=1000, count=1, num=0, ...)
+    """
+
+    __slots__ = ("row_cls", "regex", "bytes_regex", "int_fields", "str_fields")
+
+    def __init__(self, row_cls: Type[OneRow], pattern_list: Sequence[str]):
+        self.row_cls = row_cls
+        self.regex = re.compile(",".join(pattern_list))
+        # the same patterns on raw bytes, see `parse_bytes()`
+        self.bytes_regex = re.compile(",".join(pattern_list).encode("ascii"))
+        # groups cast to int while parsing, empty string as 0
+        self.int_fields = [f.name for f in fields(row_cls) if f.type is int and f.name in self.regex.groupindex]
+        self.str_fields = [name for name in self.regex.groupindex if name not in self.int_fields]
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def of(row_cls: Type[OneRow], pattern_list: Sequence[str]) -> "OneRowParser":
+        """
+        Args:
+            row_cls: class to instantiate from the matched groups
+            pattern_list: hashable sequence of patterns, joined with `,`
+
+        Returns:
+            cached parser of the pattern set
+        """
+        return OneRowParser(row_cls=row_cls, pattern_list=pattern_list)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        _text = text.translate(FORMAT_TABLE)
+        # mojimoji is a no-op for pure ASCII lines
+        if _text.isascii():
+            return _text
         _text = mojimoji.zen_to_han(_text, kana=False)
         _text = mojimoji.han_to_zen(_text, digit=False, ascii=False)
         return _text
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def normalize_bytes(value: bytes, encoding: str) -> str:
+        """
+        `normalize()` of an undecoded field; merchant names repeat, so the results are cached.
+        """
+        return OneRowParser.normalize(value.decode(encoding))
+
+    def parse(self, text: str, row_filter: Optional["RowFilter"] = None) -> Optional[OneRow]:
+        """
+        Args:
+            text: one line of the file
+            row_filter: if set, rows out of it are dropped right after the match
+
+        Returns:
+
+        """
+        result = self.regex.match(self.normalize(text))
+        if result:
+            data = result.groupdict()
+            if row_filter is not None and not (
+                row_filter.match_date(data["date"]) and row_filter.match_description(data["description"])
+            ):
+                return None
+            for name in self.int_fields:
+                value = data[name]
+                data[name] = int(value) if value else 0
+            return self.row_cls(**data)
+        return None
+
+    def parse_bytes(self, line: bytes, encoding: str, row_filter: Optional["RowFilter"] = None) -> Optional[OneRow]:
+        """
+        Parses an undecoded line of an ASCII-compatible encoding (`BYTES_ENCODINGS`).
+
+        The fields are split on the raw bytes, and only the non-ASCII str fields are
+        decoded and normalised. Multibyte characters of these encodings never contain
+        the ASCII delimiters and digits, so the split is the same as on the decoded text.
+        Falls back to `parse()` when the bytes do not match, or when the normalisation
+        would move a delimiter (e.g. full-width digits, `，` or `．`).
+
+        Args:
+            line: one line of the file
+            encoding: encoding of the file
+            row_filter: if set, rows out of it are dropped; the date is checked before any decoding
+
+        Returns:
+
+        """
+        result = self.bytes_regex.match(line.translate(None, b" \t\r\n"))
+        if result is None:
+            return self.parse(line.rstrip(b"\r\n").decode(encoding), row_filter=row_filter)
+        data = result.groupdict()
+        if row_filter is not None and not row_filter.match_date(data["date"].decode("ascii")):
+            return None
+        for name in self.int_fields:
+            value = data[name]
+            data[name] = int(value) if value else 0
+        for name in self.str_fields:
+            value = data[name]
+            if value.isascii():
+                data[name] = value.decode("ascii")
+                continue
+            value = self.normalize_bytes(value, encoding)
+            if not value or "," in value or "." in value:
+                return self.parse(line.rstrip(b"\r\n").decode(encoding), row_filter=row_filter)
+            data[name] = value
+        if row_filter is not None and not row_filter.match_description(data["description"]):
+            return None
+        return self.row_cls(**data)
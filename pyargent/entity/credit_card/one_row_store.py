@@ -0,0 +1,173 @@
+from array import array
+from collections.abc import Sequence
+from dataclasses import fields
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List
+
+from .one_row import OneRow
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# int fields are kept in array("q"), str fields as codes into a shared string list
+INT_FIELDS = [f.name for f in fields(OneRow) if f.type is int]
+STR_FIELDS = [f.name for f in fields(OneRow) if f.type is not int]
+ROW_FIELDS = [f.name for f in fields(OneRow)]
+
+
+class OneRowStore(Sequence):
+    """
+    Compact, column-oriented container of `OneRow`.
+
+    Behaves like `List[OneRow]` (len, index, slice, iterate, append, extend),
+    but keeps one typed array per field instead of one object per row;
+    `date`, `description` and `comment` are dictionary-encoded.
+
+    Examples:
+        >>> store = OneRowStore([OneRow(date="2021/01/05", description="AMAZON", total_billing=1000)])
+        >>> store[0]
+        OneRow(date='2021/01/05', description='AMAZON', total_billing=1000, count=0, num=0, actual_billing=0, comment='')
+        >>> store.to_columns()["total_billing"]
+        array([1000])
+    """
+
+    __slots__ = ("int_columns", "code_columns", "strings", "string_index")
+
+    def __init__(self, one_row_list: Iterable[OneRow] = ()):
+        self.int_columns: Dict[str, array] = {name: array("q") for name in INT_FIELDS}
+        self.code_columns: Dict[str, array] = {name: array("i") for name in STR_FIELDS}
+        self.strings: List[str] = []
+        self.string_index: Dict[str, int] = {}
+        self.extend(one_row_list)
+
+    @staticmethod
+    def from_columns(columns: Dict[str, "np.ndarray"]) -> "OneRowStore":
+        """
+        Args:
+            columns: one array per `OneRow` field, as given by `to_columns()`
+
+        Returns:
+
+        """
+        import numpy as np
+
+        store = OneRowStore()
+        for name in INT_FIELDS:
+            store.int_columns[name].frombytes(np.asarray(columns[name], dtype=np.longlong).tobytes())
+        str_column_list = [np.asarray(columns[name], dtype=object) for name in STR_FIELDS]
+        if len(str_column_list[0]):
+            strings, codes = np.unique(np.concatenate(str_column_list).astype(str), return_inverse=True)
+            store.strings = strings.tolist()
+            store.string_index = {s: i for i, s in enumerate(store.strings)}
+            for name, name_codes in zip(STR_FIELDS, np.split(codes.astype(np.intc), len(STR_FIELDS))):
+                store.code_columns[name].frombytes(name_codes.tobytes())
+        return store
+
+    def to_columns(self) -> Dict[str, "np.ndarray"]:
+        """
+        Returns:
+            int64 arrays for int fields, object arrays for str fields
+        """
+        import numpy as np
+
+        columns = {}
+        strings = np.array(self.strings, dtype=object)
+        for name in ROW_FIELDS:
+            if name in self.int_columns:
+                columns[name] = np.frombuffer(self.int_columns[name], dtype=np.longlong).astype(np.int64)
+            else:
+                columns[name] = strings[np.frombuffer(self.code_columns[name], dtype=np.intc)]
+        return columns
+
+    def _code(self, value: str) -> int:
+        code = self.string_index.get(value)
+        if code is None:
+            code = len(self.strings)
+            self.strings.append(value)
+            self.string_index[value] = code
+        return code
+
+    def append(self, one_row: OneRow):
+        for name, column in self.int_columns.items():
+            column.append(getattr(one_row, name))
+        for name, column in self.code_columns.items():
+            column.append(self._code(getattr(one_row, name)))
+
+    def extend(self, one_row_list: Iterable[OneRow]):
+        if not isinstance(one_row_list, OneRowStore):
+            for one_row in one_row_list:
+                self.append(one_row)
+            return
+        import numpy as np
+
+        # build every new column first: the other store may be `self`, whose buffers
+        # cannot be resized while exported, and a failure must not leave the columns misaligned
+        int_bytes = {name: one_row_list.int_columns[name].tobytes() for name in self.int_columns}
+        # re-map the codes of the other store into this one
+        mapping = np.array([self._code(s) for s in list(one_row_list.strings)], dtype=np.intc)
+        code_bytes = {}
+        for name in self.code_columns:
+            codes = np.frombuffer(one_row_list.code_columns[name], dtype=np.intc)
+            code_bytes[name] = mapping[codes].tobytes() if len(codes) else b""
+            del codes
+        for name, column in self.int_columns.items():
+            column.frombytes(int_bytes[name])
+        for name, column in self.code_columns.items():
+            column.frombytes(code_bytes[name])
+
+    def compress(self, mask: "np.ndarray") -> "OneRowStore":
+        """
+        Args:
+            mask: bool array, one per row
+
+        Returns:
+            rows where `mask` is True; the string list is copied as a whole
+        """
+        import numpy as np
+
+        store = OneRowStore()
+        for name, column in self.int_columns.items():
+            store.int_columns[name] = array("q", np.frombuffer(column, dtype=np.longlong)[mask].tobytes())
+        for name, column in self.code_columns.items():
+            store.code_columns[name] = array("i", np.frombuffer(column, dtype=np.intc)[mask].tobytes())
+        store.strings = list(self.strings)
+        store.string_index = dict(self.string_index)
+        return store
+
+    def __len__(self) -> int:
+        return len(self.int_columns[INT_FIELDS[0]])
+
+    def _row(self, index: int) -> OneRow:
+        values = {name: column[index] for name, column in self.int_columns.items()}
+        values.update({name: self.strings[column[index]] for name, column in self.code_columns.items()})
+        return OneRow(**values)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            # slices the columns, and copies the whole string list
+            store = OneRowStore()
+            for name, column in self.int_columns.items():
+                store.int_columns[name] = column[index]
+            for name, column in self.code_columns.items():
+                store.code_columns[name] = column[index]
+            store.strings = list(self.strings)
+            store.string_index = dict(self.string_index)
+            return store
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("OneRowStore index out of range")
+        return self._row(index)
+
+    def __iter__(self) -> Iterator[OneRow]:
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"OneRowStore({list(self)!r})"
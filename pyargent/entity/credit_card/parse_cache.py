@@ -0,0 +1,119 @@
+from dataclasses import dataclass
+import hashlib
+import os
+import tempfile
+import zipfile
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from .one_row_store import ROW_FIELDS, OneRowStore
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass(frozen=True)
+class ParseCache:
+    """
+    Parsed rows of each statement file, stored as `.npz` columns in `cache_dir`.
+
+    An entry is keyed by the file path and encoding, and is valid while
+    the file keeps the same mtime and size.
+    The earliest and latest dates are stored too, to skip files out of a `RowFilter` range.
+
+    Examples:
+        >>> import glob
+        >>> from pyargent.entity.credit_card import OneFile, ParseCache
+        >>> cache = ParseCache(cache_dir="./data/.parse_cache")
+        >>> one_file = OneFile.from_file_path_list(glob.glob("./data/*.csv"), parse_cache=cache)
+    """
+
+    cache_dir: str
+
+    # bump when the parsing rule changes, to discard old entries
+    VERSION = 2
+
+    def cache_path(self, file_path: str, encoding: str) -> str:
+        key = hashlib.sha1(f"{os.path.abspath(file_path)}:{encoding}".encode("utf-8")).hexdigest()
+        return f"{self.cache_dir}/{key}.npz"
+
+    # raised by `np.load` for a truncated or otherwise unreadable entry
+    READ_ERRORS = (OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile)
+
+    def _stamp(self, file_path: str) -> "np.ndarray":
+        import numpy as np
+
+        stat = os.stat(file_path)
+        return np.array([self.VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+
+    def load(self, file_path: str, encoding: str) -> Optional[OneRowStore]:
+        """
+        Args:
+            file_path: path of the statement csv
+            encoding: file encoding
+
+        Returns:
+            cached rows, or None if missing, outdated or unreadable
+        """
+        import numpy as np
+
+        path = self.cache_path(file_path, encoding)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if not np.array_equal(data["__stamp__"], self._stamp(file_path)):
+                    return None
+                return OneRowStore.from_columns({name: data[name] for name in ROW_FIELDS})
+        except self.READ_ERRORS:
+            return None
+
+    def date_range(self, file_path: str, encoding: str) -> Optional[Tuple[str, str]]:
+        """
+        Reads only the date range, without the rows.
+
+        Returns:
+            (earliest, latest) date, ("", "") if the file has no rows, or None if missing, outdated or unreadable
+        """
+        import numpy as np
+
+        path = self.cache_path(file_path, encoding)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                if not np.array_equal(data["__stamp__"], self._stamp(file_path)):
+                    return None
+                first, last = data["__date_range__"].tolist()
+                return first, last
+        except self.READ_ERRORS:
+            return None
+
+    def save(self, file_path: str, encoding: str, one_row_list: OneRowStore):
+        """
+        Args:
+            file_path: path of the statement csv
+            encoding: file encoding
+            one_row_list: parsed rows of `file_path`
+
+        Returns:
+
+        """
+        import numpy as np
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        column_dict = {
+            name: column if column.dtype != object else column.astype(np.str_)
+            for name, column in one_row_list.to_columns().items()
+        }
+        unique_date = np.unique(column_dict["date"])
+        date_range = np.array([unique_date[0], unique_date[-1]] if len(unique_date) else ["", ""], dtype=np.str_)
+        path = self.cache_path(file_path, encoding)
+        # a temporary file per writer, so that concurrent saves of the same entry never share one
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp", dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, __stamp__=self._stamp(file_path), __date_range__=date_range, **column_dict)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
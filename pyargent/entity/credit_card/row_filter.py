@@ -0,0 +1,79 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from .one_row_store import OneRowStore
+
+
+@dataclass(frozen=True)
+class RowFilter:
+    """
+    Conditions applied while parsing, so that unmatched rows are never built.
+
+    `start` and `end` are inclusive, and compared as strings with the leading
+    characters of `date`: "2021/03/15", "2021/03" or "2021" (`-` is read as `/`).
+    `groups` keeps the descriptions starting with any of the labels.
+
+    Merchant group labels are the common prefixes of the descriptions that were loaded,
+    so a narrower load may give longer labels than the full history.
+    Pass a `MerchantGroupCache` built from the full history to keep them stable.
+
+    Examples:
+        >>> row_filter = RowFilter(start="2021-01", end="2021-12", groups=("AMAZON",))
+        >>> one_file = OneFile.from_file_path_list(glob.glob("./data/*.csv"), row_filter=row_filter)
+    """
+
+    start: Optional[str] = None
+    end: Optional[str] = None
+    groups: Optional[Tuple[str, ...]] = None
+
+    def __post_init__(self):
+        if self.start is not None:
+            object.__setattr__(self, "start", self.start.replace("-", "/"))
+        if self.end is not None:
+            object.__setattr__(self, "end", self.end.replace("-", "/"))
+        if self.groups is not None:
+            object.__setattr__(self, "groups", tuple(self.groups))
+
+    def has_date_range(self) -> bool:
+        return self.start is not None or self.end is not None
+
+    def match_date(self, date: str) -> bool:
+        if self.start is not None and date[: len(self.start)] < self.start:
+            return False
+        if self.end is not None and date[: len(self.end)] > self.end:
+            return False
+        return True
+
+    def match_description(self, description: str) -> bool:
+        return self.groups is None or description.startswith(self.groups)
+
+    def overlaps(self, first: str, last: str) -> bool:
+        """
+        Args:
+            first: earliest date of a file, empty if the file has no rows
+            last: latest date of a file
+
+        Returns:
+            False if no row of the file can match
+        """
+        if not first:
+            return False
+        if self.start is not None and last[: len(self.start)] < self.start:
+            return False
+        if self.end is not None and first[: len(self.end)] > self.end:
+            return False
+        return True
+
+    def filter_store(self, one_row_list: OneRowStore) -> OneRowStore:
+        """
+        Applies the conditions to already parsed rows, once per distinct string.
+        """
+        import numpy as np
+
+        date_match = np.array([self.match_date(s) for s in one_row_list.strings], dtype=bool)
+        description_match = np.array([self.match_description(s) for s in one_row_list.strings], dtype=bool)
+        date_codes = np.frombuffer(one_row_list.code_columns["date"], dtype=np.intc)
+        description_codes = np.frombuffer(one_row_list.code_columns["description"], dtype=np.intc)
+        if not len(date_codes):
+            return one_row_list
+        return one_row_list.compress(date_match[date_codes] & description_match[description_codes])
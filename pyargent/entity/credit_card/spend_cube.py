@@ -0,0 +1,119 @@
+from typing import TYPE_CHECKING, Iterable, Optional
+
+from pyargent.instrumentation import traced
+
+from .merchant_group import MerchantGroupCache, group_by_prefix
+from .one_row import OneRow
+from .one_row_store import OneRowStore
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class SpendCube:
+    """
+    Daily totals of `actual_billing`, updated incrementally as statements arrive.
+
+    The totals are kept per (date, description), because the merchant groups depend on
+    every description seen so far; the group x day table is derived from them, and cached
+    until the next `update()`. Charts of any `rule` / `date_format` are resampled from
+    that table, so the rows are never re-read.
+
+    Examples:
+        >>> cube = SpendCube()
+        >>> cube.update(OneFile.from_file_path("./data/202101.csv").one_row_list)
+        >>> cube.update(OneFile.from_file_path("./data/202102.csv").one_row_list)
+        >>> chart_df = cube.to_chart_df(rule="M")
+    """
+
+    __slots__ = ("daily", "row_count", "_group_daily", "_group_cache")
+
+    def __init__(self):
+        # (date, description) -> sum of actual_billing
+        self.daily: Optional["pd.Series"] = None
+        self.row_count = 0
+        self._group_daily: Optional["pd.DataFrame"] = None
+        self._group_cache: Optional[MerchantGroupCache] = None
+
+    @traced
+    def update(self, one_row_list: Iterable[OneRow]) -> "SpendCube":
+        """
+        Adds the rows to the daily totals.
+
+        Args:
+            one_row_list: new rows
+
+        Returns:
+            self
+        """
+        import numpy as np
+        import pandas as pd
+
+        if not isinstance(one_row_list, OneRowStore):
+            one_row_list = OneRowStore(one_row_list)
+        if self.daily is None:
+            index = pd.MultiIndex.from_arrays([[], []], names=["date", "description"])
+            self.daily = pd.Series([], index=index, dtype="int64", name="actual_billing")
+        if not len(one_row_list):
+            return self
+
+        # aggregate on the dictionary codes, then decode only the distinct keys
+        date = np.asarray(one_row_list.code_columns["date"], dtype=np.intc)
+        description = np.asarray(one_row_list.code_columns["description"], dtype=np.intc)
+        amount = np.asarray(one_row_list.int_columns["actual_billing"], dtype=np.int64)
+        batch = pd.Series(amount).groupby([date, description], sort=False).sum()
+        strings = np.array(one_row_list.strings, dtype=object)
+        batch.index = pd.MultiIndex.from_arrays(
+            [strings[batch.index.get_level_values(0)], strings[batch.index.get_level_values(1)]],
+            names=["date", "description"],
+        )
+
+        self.daily = self.daily.add(batch, fill_value=0).astype("int64").rename("actual_billing")
+        self.row_count += len(one_row_list)
+        self._group_daily = None
+        return self
+
+    def group_daily(self, group_cache: Optional[MerchantGroupCache] = None) -> "pd.DataFrame":
+        """
+        Args:
+            group_cache: merchant groups shared across runs
+
+        Returns:
+            daily totals, indexed by date with one column per merchant group
+        """
+        import pandas as pd
+
+        if self.daily is None:
+            self.update([])
+        if self._group_daily is not None and self._group_cache is group_cache:
+            return self._group_daily
+
+        description = self.daily.index.get_level_values("description")
+        unique_description = description.unique()
+        group = group_by_prefix(pd.Series(unique_description), group_cache=group_cache).to_numpy()
+        group_list = group[unique_description.get_indexer(description)]
+        df = self.daily.groupby([self.daily.index.get_level_values("date"), group_list]).sum().unstack(fill_value=0)
+        df.index = pd.to_datetime(df.index, format=OneRow.DATE_FORMAT)
+        df.index.name = "date"
+        df.columns.name = "group"
+
+        self._group_daily = df
+        self._group_cache = group_cache
+        return df
+
+    def to_chart_df(
+        self, rule="M", date_format="%Y-%m", group_cache: Optional[MerchantGroupCache] = None
+    ) -> "pd.DataFrame":
+        """
+
+        Args:
+            rule: resampling interval rule, argument for `resample()`
+            date_format: X-Axis date format
+            group_cache: merchant groups shared across runs
+
+        Returns:
+
+        """
+        df = self.group_daily(group_cache=group_cache).resample(rule=rule).sum()
+        df.index = df.index.strftime(date_format).rename(None)
+        return df
@@ -1 +1,3 @@
-from .salary import Salary, SalaryDeduction, SalaryTax, SalaryPayment, SalaryRepository
+from .salary import Salary, SalaryDeduction, SalaryTax, SalaryPayment, SalaryRepository, AsyncSalaryRepository
+from .codec import DataclassCodec, codec_for
+from .compact import CompactSalary, CompactSalaryDeduction, CompactSalaryPayment, CompactSalaryTax, to_compact
@@ -0,0 +1,95 @@
+from dataclasses import dataclass, fields
+from typing import List
+
+import pandas as pd
+
+from .salary import Salary, SalaryDeduction, SalaryPayment, SalaryTax
+
+PAYMENT_COLUMNS = [f.name for f in fields(SalaryPayment)]
+TAXABLE_COLUMNS = ["basic_payment", "overtime_fee", "static_overtime_fee"]
+DEDUCTION_COLUMNS = [f.name for f in fields(SalaryDeduction)] + [f.name for f in fields(SalaryTax)]
+
+
+@dataclass
+class SalaryFrame:
+    """
+    複数の給与を一つのDataFrameにして、集計をまとめて計算する
+
+    Examples:
+        >>> from pyargent import py_argent
+        >>> pa = py_argent(storage="s3", prefix="salary", s3_bucket="some-bucket")
+        >>> salary_frame = SalaryFrame.from_salaries(pa.load_salary_range(start="2012-01", end="2021-12"))
+        >>> salary_frame.yearly(by_company=True)
+    """
+
+    df: pd.DataFrame
+
+    @staticmethod
+    def from_salaries(salaries: List[Salary]) -> "SalaryFrame":
+        df = pd.DataFrame([s.flatten() for s in salaries], columns=Salary.flat_fields())
+        return SalaryFrame.from_flat_df(df)
+
+    @staticmethod
+    def from_flat_df(df: pd.DataFrame) -> "SalaryFrame":
+        """
+        Args:
+            df: `Salary.flatten()`の列を持つDataFrame。`SalaryParquet.load_frame()`の結果など
+
+        Returns:
+
+        """
+        df = df.copy()
+        payment_date = pd.to_datetime(df["payment_date"], format="%Y-%m-%d")
+        df["dt"] = payment_date.dt.strftime("%Y_%m")
+        df["year"] = payment_date.dt.year
+        return SalaryFrame(df=df)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        給与ごとの総支給額・課税対象額・控除額合計・差引支給額
+
+        Returns:
+            `Salary.total_payments()`などと同じ値を、給与ごとに持つDataFrame
+        """
+        df = self.df[["dt", "year", "company"]].copy()
+        df["total_payments"] = self.df[PAYMENT_COLUMNS].to_numpy().sum(axis=1)
+        df["taxable"] = self.df[TAXABLE_COLUMNS].to_numpy().sum(axis=1)
+        df["total_deductions"] = self.df[DEDUCTION_COLUMNS].to_numpy().sum(axis=1)
+        df["net_payment"] = df["total_payments"] - df["total_deductions"]
+        return df
+
+    def yearly(self, by_company=False) -> pd.DataFrame:
+        """
+        年ごとの合計
+
+        Args:
+            by_company: Trueの場合は年・会社ごと
+
+        Returns:
+
+        """
+        keys = ["year", "company"] if by_company else ["year"]
+        return self._aggregate(keys=keys)
+
+    def monthly(self, by_company=False) -> pd.DataFrame:
+        """
+        月（`dt`）ごとの合計
+
+        Args:
+            by_company: Trueの場合は月・会社ごと
+
+        Returns:
+
+        """
+        keys = ["dt", "company"] if by_company else ["dt"]
+        return self._aggregate(keys=keys)
+
+    def by_company(self) -> pd.DataFrame:
+        """
+        会社ごとの合計
+        """
+        return self._aggregate(keys=["company"])
+
+    def _aggregate(self, keys: List[str]) -> pd.DataFrame:
+        value_columns = ["total_payments", "taxable", "total_deductions", "net_payment"]
+        return self.summary().groupby(keys)[value_columns].sum()
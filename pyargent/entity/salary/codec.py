@@ -0,0 +1,101 @@
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+import json
+from operator import attrgetter
+from typing import Any, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class DataclassCodec:
+    """
+    dataclassと辞書・タプル・JSONの変換器。クラスごとに一度だけ作る
+
+    入れ子のdataclassも、それぞれの変換器で再帰的に変換する。
+    `asdict`のような深いコピーや、呼び出しごとのフィールド名の確認はしない。
+
+    Examples:
+        >>> codec = codec_for(Salary)
+        >>> data = codec.to_dict(salary)
+        >>> codec.from_dict(data) == salary
+        True
+    """
+
+    __slots__ = ("cls", "names", "getter", "nested", "width")
+
+    def __init__(self, cls: type):
+        self.cls = cls
+        self.names = tuple(f.name for f in fields(cls))
+        self.getter = attrgetter(*self.names)
+        # 入れ子のdataclassのフィールド
+        self.nested = {f.name: codec_for(f.type) for f in fields(cls) if is_dataclass(f.type)}
+        # `to_tuple()`の長さ
+        self.width = sum(self.nested[name].width if name in self.nested else 1 for name in self.names)
+
+    def to_dict(self, obj) -> dict:
+        data = dict(zip(self.names, self.getter(obj)))
+        for name, codec in self.nested.items():
+            data[name] = codec.to_dict(data[name])
+        return data
+
+    def from_dict(self, data: dict):
+        """
+        余分なキーは無視し、ないキーはdataclassの既定値になる
+        """
+        _data = {name: data[name] for name in self.names if name in data}
+        for name, codec in self.nested.items():
+            _data[name] = codec.from_dict(data.get(name, {}))
+        return self.cls(**_data)
+
+    def to_tuple(self, obj) -> Tuple[Any, ...]:
+        """
+        入れ子を展開したフィールドの値を、定義順に並べたタプル
+        """
+        if not self.nested:
+            return self.getter(obj)
+        values = []
+        for name, value in zip(self.names, self.getter(obj)):
+            if name in self.nested:
+                values.extend(self.nested[name].to_tuple(value))
+            else:
+                values.append(value)
+        return tuple(values)
+
+    def from_tuple(self, values: Tuple[Any, ...]):
+        """
+        `to_tuple()`の逆変換
+        """
+        if not self.nested:
+            return self.cls(*values)
+        args = []
+        i = 0
+        for name in self.names:
+            if name in self.nested:
+                codec = self.nested[name]
+                args.append(codec.from_tuple(values[i : i + codec.width]))
+                i += codec.width
+            else:
+                args.append(values[i])
+                i += 1
+        return self.cls(*args)
+
+    def dumps_json(self, obj) -> bytes:
+        """
+        orjsonがあればorjsonで、なければ標準のjsonで書き出す
+        """
+        if orjson is not None:
+            return orjson.dumps(self.to_dict(obj))
+        return json.dumps(self.to_dict(obj), ensure_ascii=False).encode("utf-8")
+
+    def loads_json(self, raw: Union[bytes, str]):
+        if orjson is not None:
+            return self.from_dict(orjson.loads(raw))
+        return self.from_dict(json.loads(raw))
+
+
+@lru_cache(maxsize=None)
+def codec_for(cls: type) -> DataclassCodec:
+    return DataclassCodec(cls)
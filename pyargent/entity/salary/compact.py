@@ -0,0 +1,110 @@
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Dict
+
+from .codec import codec_for
+from .salary import Salary, SalaryDeduction, SalaryPayment, SalaryTax
+
+# dataclassが生成する属性。`slotted()`では作り直す
+_GENERATED = {
+    "__dict__",
+    "__weakref__",
+    "__dataclass_fields__",
+    "__dataclass_params__",
+    "__init__",
+    "__repr__",
+    "__eq__",
+    "__hash__",
+    "__setattr__",
+    "__delattr__",
+    "__match_args__",
+    "__lt__",
+    "__le__",
+    "__gt__",
+    "__ge__",
+    "__annotations__",
+}
+
+
+def _getstate(self):
+    return [getattr(self, f.name) for f in fields(self)]
+
+
+def _setstate(self, state):
+    for f, value in zip(fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+def slotted(cls: type, name: str, replace_types: Dict[type, type]) -> type:
+    """
+    `cls`と同じフィールド・メソッドを持ち、`__dict__`の代わりに`__slots__`を使うfrozen dataclassを作る
+
+    Args:
+        cls: frozen dataclass
+        name: 新しいクラスの名前
+        replace_types: 入れ子のdataclassの置き換え先
+
+    Returns:
+
+    """
+    field_list = fields(cls)
+    namespace = {k: v for k, v in cls.__dict__.items() if k not in _GENERATED and k not in cls.__dataclass_fields__}
+    namespace["__qualname__"] = name
+    namespace["__module__"] = __name__
+    namespace["__annotations__"] = {}
+    for f in field_list:
+        f_type = replace_types.get(f.type, f.type)
+        default_factory = replace_types.get(f.default_factory, f.default_factory)
+        namespace["__annotations__"][f.name] = f_type
+        namespace[f.name] = field(
+            default=f.default,
+            default_factory=default_factory,
+            init=f.init,
+            repr=f.repr,
+            hash=f.hash,
+            compare=f.compare,
+            metadata=f.metadata,
+        )
+    base = dataclass(frozen=True)(type(name, cls.__bases__, namespace))
+
+    # dataclass生成後に、フィールドとメモ化の属性を__slots__に置き換える
+    memo_attr_list = [v.memo_attr for v in namespace.values() if hasattr(v, "memo_attr")]
+    cls_dict = {k: v for k, v in base.__dict__.items() if k not in ("__dict__", "__weakref__")}
+    for f in field_list:
+        cls_dict.pop(f.name, None)
+    cls_dict["__slots__"] = tuple(f.name for f in field_list) + tuple(memo_attr_list)
+    cls_dict["__getstate__"] = _getstate
+    cls_dict["__setstate__"] = _setstate
+    return type(base)(name, base.__bases__, cls_dict)
+
+
+CompactSalaryPayment = slotted(SalaryPayment, "CompactSalaryPayment", {})
+CompactSalaryDeduction = slotted(SalaryDeduction, "CompactSalaryDeduction", {})
+CompactSalaryTax = slotted(SalaryTax, "CompactSalaryTax", {})
+CompactSalary = slotted(
+    Salary,
+    "CompactSalary",
+    {
+        SalaryPayment: CompactSalaryPayment,
+        SalaryDeduction: CompactSalaryDeduction,
+        SalaryTax: CompactSalaryTax,
+    },
+)
+
+_COMPACT_TYPES = {
+    Salary: CompactSalary,
+    SalaryPayment: CompactSalaryPayment,
+    SalaryDeduction: CompactSalaryDeduction,
+    SalaryTax: CompactSalaryTax,
+}
+
+
+def to_compact(obj):
+    """
+    `Salary`などを`__slots__`版に変換する
+
+    Examples:
+        >>> salary_list = [to_compact(s) for s in pa.load_salary_range(start="2012-01", end="2021-12")]
+    """
+    if not is_dataclass(obj) or type(obj) not in _COMPACT_TYPES:
+        raise ValueError(f"{type(obj)} has no compact variant")
+    return codec_for(_COMPACT_TYPES[type(obj)]).from_tuple(codec_for(type(obj)).to_tuple(obj))
@@ -1,7 +1,31 @@
 from abc import ABCMeta, abstractmethod
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, replace
 from datetime import datetime
-from typing import List
+from functools import wraps
+from typing import List, Optional, Tuple, Union
+
+from .codec import codec_for
+
+
+def memoize(method):
+    """
+    frozenなインスタンスごとに、引数のないメソッドの結果を一度だけ計算して保持する
+
+    結果は`memo_attr`の属性に保持するので、`__slots__`を使うクラスではその名前の枠を用意する
+    """
+    memo_attr = f"_memo_{method.__name__}"
+
+    @wraps(method)
+    def wrapper(self):
+        try:
+            return getattr(self, memo_attr)
+        except AttributeError:
+            value = method(self)
+            object.__setattr__(self, memo_attr, value)
+            return value
+
+    wrapper.memo_attr = memo_attr
+    return wrapper
 
 
 @dataclass(frozen=True)
@@ -12,19 +36,20 @@ class SalaryPayment:
     commuting_fee: int = field(default_factory=int, metadata={"jp": "通勤（非課税）"})
     additional_allowance: int = field(default_factory=int, metadata={"jp": "その他手当"})
 
+    @memoize
     def total(self):
-        return sum(self.__dict__.values())
+        return sum(codec_for(type(self)).getter(self))
 
+    @memoize
     def taxable(self):
         return sum([self.basic_payment, self.overtime_fee, self.static_overtime_fee])
 
-    @staticmethod
-    def loads(data: dict):
-        _data = {k: v for k, v in data.items() if k in SalaryPayment.__dataclass_fields__.keys()}
-        return SalaryPayment(**_data)
+    @classmethod
+    def loads(cls, data: dict):
+        return codec_for(cls).from_dict(data)
 
     def dumps(self):
-        return asdict(self)
+        return codec_for(type(self)).to_dict(self)
 
 
 @dataclass(frozen=True)
@@ -35,16 +60,16 @@ class SalaryDeduction:
     pension_fund: int = field(default_factory=int, metadata={"jp": "年金基金"})
     employment_insurance: int = field(default_factory=int, metadata={"jp": "雇用保険"})
 
+    @memoize
     def total(self):
-        return sum(self.__dict__.values())
+        return sum(codec_for(type(self)).getter(self))
 
-    @staticmethod
-    def loads(data: dict):
-        _data = {k: v for k, v in data.items() if k in SalaryDeduction.__dataclass_fields__.keys()}
-        return SalaryDeduction(**_data)
+    @classmethod
+    def loads(cls, data: dict):
+        return codec_for(cls).from_dict(data)
 
     def dumps(self):
-        return asdict(self)
+        return codec_for(type(self)).to_dict(self)
 
 
 @dataclass(frozen=True)
@@ -53,16 +78,16 @@ class SalaryTax:
     inhabitant_tax: int = field(default_factory=int, metadata={"jp": "住民税"})
     year_end_tax_adjustment: int = field(default_factory=int, metadata={"jp": "年末調整"})
 
+    @memoize
     def total(self):
-        return sum(self.__dict__.values())
+        return sum(codec_for(type(self)).getter(self))
 
-    @staticmethod
-    def loads(data: dict):
-        _data = {k: v for k, v in data.items() if k in SalaryTax.__dataclass_fields__.keys()}
-        return SalaryTax(**_data)
+    @classmethod
+    def loads(cls, data: dict):
+        return codec_for(cls).from_dict(data)
 
     def dumps(self):
-        return asdict(self)
+        return codec_for(type(self)).to_dict(self)
 
 
 @dataclass(frozen=True)
@@ -76,21 +101,64 @@ class Salary:
     company: str = field(default=str, metadata={"jp": "所得税など"})
     version: str = field(default="1", metadata={"jp": "版"})
 
+    @classmethod
+    def loads(cls, data: dict):
+        return codec_for(cls).from_dict(data)
+
+    def dumps(self):
+        return codec_for(type(self)).to_dict(self)
+
+    @classmethod
+    def loads_json(cls, raw: Union[bytes, str]):
+        return codec_for(cls).loads_json(raw)
+
+    def dumps_json(self) -> bytes:
+        return codec_for(type(self)).dumps_json(self)
+
     @staticmethod
-    def loads(data: dict):
-        _data = {k: v for k, v in data.items() if k in ["payment_date", "calc_start_date", "calc_end_date"]}
-        _data.update(
-            {
-                "salary_payment": SalaryPayment.loads(data.get("salary_payment", {})),
-                "salary_deduction": SalaryDeduction.loads(data.get("salary_deduction", {})),
-                "salary_tax": SalaryTax.loads(data.get("salary_tax", {})),
-            }
+    def flat_fields() -> List[str]:
+        """
+        `flatten()`のキー。`Salary.of`の引数と`version`
+        """
+        return (
+            ["company", "payment_date", "calc_start_date", "calc_end_date"]
+            + [f.name for f in fields(SalaryPayment)]
+            + [f.name for f in fields(SalaryDeduction)]
+            + [f.name for f in fields(SalaryTax)]
+            + ["version"]
         )
-        return Salary(**_data)
 
-    def dumps(self):
-        return asdict(self)
+    def flatten(self) -> dict:
+        """
+        給与・保険・所得税などを一階層に展開した辞書
 
+        Returns:
+
+        """
+        data = {
+            "company": self.company,
+            "payment_date": self.payment_date,
+            "calc_start_date": self.calc_start_date,
+            "calc_end_date": self.calc_end_date,
+        }
+        data.update(self.salary_payment.dumps())
+        data.update(self.salary_deduction.dumps())
+        data.update(self.salary_tax.dumps())
+        data["version"] = self.version
+        return data
+
+    @staticmethod
+    def unflatten(data: dict) -> "Salary":
+        """
+        `flatten()`の逆変換。余分なキーは無視する
+
+        Returns:
+
+        """
+        salary = Salary.of(**{k: data[k] for k in Salary.flat_fields() if k != "version"})
+        return replace(salary, version=data.get("version", salary.version))
+
+    @memoize
     def total_payments(self) -> int:
         """
         総支給額
@@ -100,6 +168,7 @@ class Salary:
         """
         return self.salary_payment.total()
 
+    @memoize
     def total_deductions(self) -> int:
         """
         控除額合計
@@ -109,6 +178,7 @@ class Salary:
         """
         return self.salary_deduction.total() + self.salary_tax.total()
 
+    @memoize
     def net_payment(self) -> int:
         """
         差引支給額
@@ -118,6 +188,7 @@ class Salary:
         """
         return self.total_payments() - self.total_deductions()
 
+    @memoize
     def dt(self) -> str:
         return datetime.strptime(self.payment_date, "%Y-%m-%d").strftime("%Y_%m")
 
@@ -178,6 +249,32 @@ class SalaryRepository(metaclass=ABCMeta):
     def file_name(salary: Salary) -> str:
         return f"{salary.dt()}_{salary.company}.json"
 
+    @staticmethod
+    def parse_file_name(file_name: str) -> Tuple[str, str]:
+        """
+        `file_name()`の逆変換
+
+        Returns:
+            (dt, company)
+        """
+        return file_name[:7], file_name[8 : -len(".json")]
+
+    @staticmethod
+    def in_range(file_name: str, start: str, end: str, companies: Optional[List[str]] = None) -> bool:
+        """
+        ファイル名が`start`から`end`の月（両端を含む）、かつ`companies`のものかどうか
+
+        Args:
+            file_name: `file_name()`の形式
+            start: YYYY-MM または YYYY_MM
+            end: YYYY-MM または YYYY_MM
+            companies: Noneの場合はすべての会社
+        """
+        dt, company = SalaryRepository.parse_file_name(file_name)
+        if companies is not None and company not in companies:
+            return False
+        return start.replace("-", "_") <= dt <= end.replace("-", "_")
+
     @abstractmethod
     def path(self) -> str:
         raise NotImplementedError
@@ -189,3 +286,47 @@ class SalaryRepository(metaclass=ABCMeta):
     @abstractmethod
     def load(self, dt: str) -> List[Salary]:
         raise NotImplementedError
+
+    @abstractmethod
+    def save_many(self, salaries: List[Salary]) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        raise NotImplementedError
+
+
+@dataclass(frozen=True)
+class AsyncSalaryRepository(metaclass=ABCMeta):
+    """
+    `SalaryRepository`の非同期版
+    """
+
+    file_name = staticmethod(SalaryRepository.file_name)
+    parse_file_name = staticmethod(SalaryRepository.parse_file_name)
+    in_range = staticmethod(SalaryRepository.in_range)
+
+    @abstractmethod
+    def path(self) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save(self, salary: Salary) -> str:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def load(self, dt: str) -> List[Salary]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_many(self, salaries: List[Salary]) -> List[str]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        raise NotImplementedError
+
+    async def close(self):
+        """
+        接続などを閉じる。イベントループを終える前に呼ぶ
+        """
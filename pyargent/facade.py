@@ -0,0 +1,99 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from injector import Injector, inject
+
+from pyargent.entity.salary import Salary, SalaryRepository, AsyncSalaryRepository
+from .di_container import DiS3, DiLocal, DiParquet
+
+
+@inject
+@dataclass
+class PyArgent:
+    salary_repository: SalaryRepository
+
+    def save_salary(self, salary: Salary) -> str:
+        return self.salary_repository.save(salary=salary)
+
+    def load_salary(self, dt: str) -> List[Salary]:
+        return self.salary_repository.load(dt=dt)
+
+    def save_salaries(self, salaries: List[Salary]) -> List[str]:
+        return self.salary_repository.save_many(salaries=salaries)
+
+    def load_salary_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        """
+        `start`から`end`の月（両端を含む）の給与をまとめて読み込む
+
+        Examples:
+            >>> pa = py_argent(storage="s3", prefix="salary", s3_bucket="some-bucket")
+            >>> salary_list = pa.load_salary_range(start="2021-01", end="2021-12")
+        """
+        return self.salary_repository.load_range(start=start, end=end, companies=companies)
+
+
+@inject
+@dataclass
+class AsyncPyArgent:
+    """
+    `PyArgent`の非同期版
+
+    Examples:
+        >>> pa = async_py_argent(storage="s3", prefix="salary", s3_bucket="some-bucket")
+        >>> salary_list_list = await asyncio.gather(pa.load_salary("2021-01"), pa.load_salary("2021-02"))
+    """
+
+    salary_repository: AsyncSalaryRepository
+
+    async def save_salary(self, salary: Salary) -> str:
+        return await self.salary_repository.save(salary=salary)
+
+    async def load_salary(self, dt: str) -> List[Salary]:
+        return await self.salary_repository.load(dt=dt)
+
+    async def save_salaries(self, salaries: List[Salary]) -> List[str]:
+        return await self.salary_repository.save_many(salaries=salaries)
+
+    async def load_salary_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        return await self.salary_repository.load_range(start=start, end=end, companies=companies)
+
+    async def close(self):
+        await self.salary_repository.close()
+
+
+def _injector(storage: str, prefix: str, s3_bucket: Optional[str] = None, **s3_options) -> Injector:
+    # S3以外の保存先は`s3_options`を使わないので、黙って無視しない
+    if storage in ("local", "parquet") and s3_options:
+        raise TypeError(f"storage={storage!r} does not accept {', '.join(sorted(s3_options))}")
+    if storage == "s3":
+        return Injector([DiS3(s3_bucket=s3_bucket, prefix=prefix, **s3_options)])
+    elif storage == "local":
+        return Injector([DiLocal(prefix=prefix)])
+    elif storage == "parquet":
+        return Injector([DiParquet(prefix=prefix)])
+    else:
+        raise ValueError()
+
+
+def py_argent(storage: str, prefix: str, s3_bucket: Optional[str] = None, **s3_options) -> PyArgent:
+    """
+
+    Args:
+        storage: "s3", "local" または "parquet"
+        prefix: 保存先
+        s3_bucket: storageが"s3"の場合のバケット
+        **s3_options: storageが"s3"の場合に`DiS3`に渡す。`max_concurrency`, `s3_config`, `read_cache`。
+            それ以外の保存先に渡すとTypeError
+
+    Examples:
+        >>> from pyargent.infrastructure import ReadCache, S3Config
+        >>> pa = py_argent(
+        >>>     storage="s3", prefix="salary", s3_bucket="some-bucket",
+        >>>     s3_config=S3Config(max_pool_connections=64), read_cache=ReadCache(maxsize=512, ttl=60),
+        >>> )
+    """
+    return _injector(storage=storage, prefix=prefix, s3_bucket=s3_bucket, **s3_options).get(PyArgent)
+
+
+def async_py_argent(storage: str, prefix: str, s3_bucket: Optional[str] = None, **s3_options) -> AsyncPyArgent:
+    return _injector(storage=storage, prefix=prefix, s3_bucket=s3_bucket, **s3_options).get(AsyncPyArgent)
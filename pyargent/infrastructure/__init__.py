@@ -1 +1,13 @@
 from .salary_repository import SalaryLocal, SalaryS3
+from .salary_repository_async import AsyncSalaryAdapter, AsyncSalaryS3
+from .read_cache import ReadCache
+from .s3 import S3Config
+
+
+def __getattr__(name: str):
+    # pandas・pyarrowを使う保存先は、使うときに読み込む
+    if name == "SalaryParquet":
+        from .salary_parquet import SalaryParquet
+
+        return SalaryParquet
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
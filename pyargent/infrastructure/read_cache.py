@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import Any, Hashable, Optional
+
+
+@dataclass(eq=False)
+class ReadCache:
+    """
+    読み込んだ結果を保持するLRUキャッシュ。`ttl`秒を過ぎたものは使わない
+
+    Args:
+        maxsize: 保持する件数の上限
+        ttl: 有効期間（秒）
+    """
+
+    maxsize: int = 1024
+    ttl: float = 300.0
+    entries: OrderedDict = field(default_factory=OrderedDict, init=False, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
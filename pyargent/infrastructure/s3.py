@@ -0,0 +1,52 @@
+from dataclasses import dataclass
+from functools import lru_cache
+
+
+@dataclass(frozen=True)
+class S3Config:
+    """
+    S3への接続設定
+
+    Args:
+        max_pool_connections: 接続プールの大きさ
+        max_attempts: 再試行を含めた試行回数
+        connect_timeout: 接続のタイムアウト（秒）
+        read_timeout: 読み込みのタイムアウト（秒）
+    """
+
+    max_pool_connections: int = 32
+    max_attempts: int = 5
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+
+    def config_kwargs(self) -> dict:
+        """
+        botocoreの`Config`に渡す引数
+        """
+        return {
+            "max_pool_connections": self.max_pool_connections,
+            "retries": {"max_attempts": self.max_attempts, "mode": "standard"},
+            "connect_timeout": self.connect_timeout,
+            "read_timeout": self.read_timeout,
+        }
+
+
+@lru_cache(maxsize=None)
+def s3_filesystem(config: S3Config):
+    """
+    設定ごとに一つのS3FileSystemを、初めて使うときに作る。s3fsもこのときに読み込む
+    """
+    import s3fs
+
+    return s3fs.S3FileSystem(anon=False, config_kwargs=config.config_kwargs())
+
+
+def async_s3_filesystem(config: S3Config):
+    """
+    非同期のS3FileSystem。イベントループごとに作るため共有しない
+    """
+    import s3fs
+
+    return s3fs.S3FileSystem(
+        anon=False, asynchronous=True, skip_instance_cache=True, config_kwargs=config.config_kwargs()
+    )
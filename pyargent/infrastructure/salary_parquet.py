@@ -0,0 +1,166 @@
+from dataclasses import dataclass
+import time
+from typing import Dict, List, Optional
+import uuid
+
+import fsspec
+import pandas as pd
+
+from pyargent.entity.salary import Salary, SalaryRepository
+from pyargent.instrumentation import count, traced
+
+
+@dataclass(frozen=True)
+class SalaryParquet(SalaryRepository):
+    """
+    年ごとに分割したParquetファイルに保存する
+
+    `{prefix}/year=YYYY/part-*.parquet`に、`Salary.flatten()`の列と`dt`を持つ。
+    保存は追記で、同じ`dt`と`company`は後から保存したものが優先される。
+    `compact()`で年ごとに一つのファイルにまとめる。
+    pyarrowが必要（`pip install 'pyargent[parquet]'`）。
+
+    Args:
+        prefix: ローカルのパス、または`s3://bucket/prefix`
+    """
+
+    prefix: str
+
+    def path(self) -> str:
+        return self.prefix.rstrip("/")
+
+    def fs(self) -> fsspec.AbstractFileSystem:
+        fs, _ = fsspec.core.url_to_fs(self.path())
+        return fs
+
+    def year_path(self, year: str) -> str:
+        return f"{self.path()}/year={year}"
+
+    def part_path_list(self, year: str) -> List[str]:
+        """
+        Returns:
+            保存順に並んだファイルのパス
+        """
+        fs = self.fs()
+        if not fs.exists(self.year_path(year)):
+            return []
+        return sorted(p for p in fs.ls(self.year_path(year), detail=False) if p.endswith(".parquet"))
+
+    def year_list(self) -> List[str]:
+        fs = self.fs()
+        if not fs.exists(self.path()):
+            return []
+        return sorted(p.rsplit("year=", 1)[-1] for p in fs.ls(self.path(), detail=False) if "year=" in p)
+
+    def save(self, salary: Salary) -> str:
+        return self.save_many(salaries=[salary])[0]
+
+    @traced
+    def save_many(self, salaries: List[Salary]) -> List[str]:
+        """
+        年ごとに一つのファイルを追記する
+
+        Returns:
+            各給与を書き込んだファイルのパス
+        """
+        year_dict: Dict[str, List[Salary]] = {}
+        for salary in salaries:
+            year_dict.setdefault(salary.dt()[:4], []).append(salary)
+
+        path_dict = {}
+        for year, salary_list in year_dict.items():
+            df = pd.DataFrame([s.flatten() for s in salary_list], columns=Salary.flat_fields())
+            df.insert(0, "dt", [s.dt() for s in salary_list])
+            path_dict[year] = self._write_part(year=year, df=df)
+        count("SalaryParquet.write.objects", len(salaries))
+        return [path_dict[salary.dt()[:4]] for salary in salaries]
+
+    @traced
+    def load(self, dt: str) -> List[Salary]:
+        dt_prefix = dt.replace("-", "_")
+        df = self._read_year_list(year_list=[dt_prefix[:4]], columns=None)
+        return self._to_salary_list(df[df["dt"].str.startswith(dt_prefix)])
+
+    @traced
+    def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        return self._to_salary_list(self.load_frame(start=start, end=end, companies=companies))
+
+    @traced
+    def load_frame(
+        self, start: str, end: str, companies: Optional[List[str]] = None, columns: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        集計用に、必要な列だけを読み込む
+
+        Args:
+            start: YYYY-MM または YYYY_MM
+            end: YYYY-MM または YYYY_MM
+            companies: Noneの場合はすべての会社
+            columns: 読み込む列。Noneの場合はすべての列
+
+        Returns:
+            `dt`と`company`に、`columns`を加えたDataFrame
+        """
+        start, end = start.replace("-", "_"), end.replace("-", "_")
+        year_list = [y for y in self.year_list() if start[:4] <= y <= end[:4]]
+        df = self._read_year_list(year_list=year_list, columns=columns)
+        df = df[(start <= df["dt"]) & (df["dt"] <= end)]
+        if companies is not None:
+            df = df[df["company"].isin(companies)]
+        return df.reset_index(drop=True)
+
+    def compact(self, year: Optional[str] = None) -> List[str]:
+        """
+        年ごとのファイルを一つにまとめ、重複を除く
+
+        Args:
+            year: Noneの場合はすべての年
+
+        Returns:
+            まとめたファイルのパス
+        """
+        fs = self.fs()
+        path_list = []
+        for y in [year] if year is not None else self.year_list():
+            part_path_list = self.part_path_list(year=y)
+            if len(part_path_list) <= 1:
+                continue
+            df = self._read_part_path_list(part_path_list=part_path_list, columns=None)
+            # 新しいファイルを書いてから古いファイルを消す。途中で読まれても重複は除かれる
+            path_list.append(self._write_part(year=y, df=df))
+            fs.rm(part_path_list)
+        return path_list
+
+    def _write_part(self, year: str, df: pd.DataFrame) -> str:
+        fs = self.fs()
+        fs.makedirs(self.year_path(year), exist_ok=True)
+        # ファイル名の辞書順が保存順になる
+        path = f"{self.year_path(year)}/part-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet"
+        with fs.open(path, "wb") as f:
+            df.to_parquet(f, index=False)
+            count("SalaryParquet.write.bytes", f.tell())
+        return path
+
+    def _read_year_list(self, year_list: List[str], columns: Optional[List[str]]) -> pd.DataFrame:
+        part_path_list = [p for year in year_list for p in self.part_path_list(year=year)]
+        return self._read_part_path_list(part_path_list=part_path_list, columns=columns)
+
+    def _read_part_path_list(self, part_path_list: List[str], columns: Optional[List[str]]) -> pd.DataFrame:
+        if columns is not None:
+            columns = ["dt", "company"] + [c for c in columns if c not in ("dt", "company")]
+        fs = self.fs()
+        df_list = []
+        for path in part_path_list:
+            with fs.open(path, "rb") as f:
+                df_list.append(pd.read_parquet(f, columns=columns))
+            count("SalaryParquet.read.parts")
+        if not df_list:
+            return pd.DataFrame(columns=columns or ["dt"] + Salary.flat_fields())
+        df = pd.concat(df_list, ignore_index=True)
+        return df.drop_duplicates(subset=["dt", "company"], keep="last").reset_index(drop=True)
+
+    @staticmethod
+    def _to_salary_list(df: pd.DataFrame) -> List[Salary]:
+        count("SalaryParquet.read.objects", len(df))
+        df = df.sort_values(["dt", "company"])
+        return [Salary.unflatten(data) for data in df.to_dict(orient="records")]
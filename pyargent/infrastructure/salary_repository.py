@@ -1,52 +1,247 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import json
-from typing import List
-
-import s3fs
+import os
+import tempfile
+import threading
+from typing import Dict, List, Optional
 
 from pyargent.entity.salary import Salary, SalaryRepository
+from pyargent.instrumentation import count, traced
+
+from .read_cache import ReadCache
+from .s3 import S3Config, s3_filesystem
 
 
 @dataclass(frozen=True)
 class SalaryS3(SalaryRepository):
+    """
+    S3に保存する
+
+    S3FileSystemは初めて使うときに作り、同じ`config`のインスタンス間で共有する。
+    `read_cache`を渡すと、一覧と読み込んだ給与を保持し、同じ読み込みではS3にアクセスしない。
+    """
+
     s3_bucket: str
     prefix: str
-    fs = s3fs.S3FileSystem(anon=False)
+    # 同時に取得するオブジェクトの上限
+    max_concurrency: int = 32
+    config: S3Config = field(default_factory=S3Config)
+    read_cache: Optional[ReadCache] = field(default=None, compare=False)
+
+    @property
+    def fs(self):
+        return s3_filesystem(self.config)
 
     def path(self):
         return f"s3://{self.s3_bucket}/{self.prefix}"
 
+    @traced
     def save(self, salary: Salary) -> str:
         path = f"{self.path()}/{self.file_name(salary=salary)}"
-        with self.fs.open(path, "w") as f:
-            json.dump(salary.dumps(), f)
+        data = salary.dumps_json()
+        with self.fs.open(path, "wb") as f:
+            f.write(data)
+        self._clear_read_cache()
+        count("SalaryS3.write.objects")
+        count("SalaryS3.write.bytes", len(data))
         return path
 
+    @traced
+    def save_many(self, salaries: List[Salary]) -> List[str]:
+        """
+        まとめて並行に書き込む
+        """
+        data_dict = {f"{self.path()}/{self.file_name(salary=salary)}": salary.dumps_json() for salary in salaries}
+        if data_dict:
+            self.fs.pipe(data_dict, batch_size=self.max_concurrency)
+            self._clear_read_cache()
+        count("SalaryS3.write.objects", len(data_dict))
+        count("SalaryS3.write.bytes", sum(map(len, data_dict.values())))
+        return list(data_dict.keys())
+
+    @traced
     def load(self, dt: str) -> List[Salary]:
         path_candidate = f"{self.path()}/{dt.replace('-', '_')}*"
-        path_list = self.fs.glob(path_candidate)
+        path_list = self._glob(path_candidate)
+        return self._load_path_list(path_list=path_list)
 
-        salary_list = []
-        for path in path_list:
-            print(path)
-            with self.fs.open(path, "r") as f:
-                data = json.load(f)
-                salary_list.append(Salary.loads(data=data))
-        return salary_list
+    @traced
+    def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        """
+        一度の一覧取得で対象を絞り込み、並行に読み込む
+        """
+        path_list = self._glob(f"{self.path()}/*.json")
+        path_list = [p for p in path_list if self.in_range(p.rsplit("/", 1)[-1], start, end, companies)]
+        return self._load_path_list(path_list=path_list)
+
+    def _glob(self, path_candidate: str) -> List[str]:
+        key = ("glob", path_candidate)
+        if self.read_cache is not None:
+            path_list = self.read_cache.get(key)
+            if path_list is not None:
+                return path_list
+        path_list = sorted(self.fs.glob(path_candidate))
+        if self.read_cache is not None:
+            self.read_cache.put(key, path_list)
+        return path_list
+
+    def _load_path_list(self, path_list: List[str]) -> List[Salary]:
+        """
+        s3fsの一括取得で、最大`max_concurrency`件ずつ並行に読み込む。`read_cache`にあるものは取得しない
+        """
+        salary_dict = {}
+        if self.read_cache is not None:
+            for path in path_list:
+                salary = self.read_cache.get(("salary", path))
+                if salary is not None:
+                    salary_dict[path] = salary
+            count("SalaryS3.read_cache.hit", len(salary_dict))
+
+        fetch_path_list = [path for path in path_list if path not in salary_dict]
+        if fetch_path_list:
+            data_dict = self.fs.cat(fetch_path_list, batch_size=self.max_concurrency)
+            count("SalaryS3.read.objects", len(fetch_path_list))
+            count("SalaryS3.read.bytes", sum(map(len, data_dict.values())))
+            for path in fetch_path_list:
+                salary_dict[path] = Salary.loads_json(data_dict[path])
+                if self.read_cache is not None:
+                    self.read_cache.put(("salary", path), salary_dict[path])
+        return [salary_dict[path] for path in path_list]
+
+    def _clear_read_cache(self):
+        # 一覧が変わるので、保存時はすべて破棄する
+        if self.read_cache is not None:
+            self.read_cache.clear()
+
+
+# 保存先ごとの索引の更新のロック。同じディレクトリの`SalaryLocal`で共有する
+_index_lock_dict: Dict[str, threading.RLock] = {}
+_index_lock_dict_lock = threading.Lock()
+
+
+def _index_lock(path: str) -> threading.RLock:
+    with _index_lock_dict_lock:
+        return _index_lock_dict.setdefault(os.path.abspath(path), threading.RLock())
 
 
 @dataclass(frozen=True)
 class SalaryLocal(SalaryRepository):
+    """
+    ローカルのディレクトリに保存する
+
+    `INDEX_FILE_NAME`に`ファイル名 -> dt, company`の索引を持ち、読み込み時はその索引から対象のファイルだけを開く。
+    索引の読み込み・更新・書き込みは保存先ごとのロックの中で行うので、スレッドから並行に保存してよい
+    """
+
     prefix: str
 
+    INDEX_FILE_NAME = "_index.json"
+    INDEX_VERSION = 1
+
     def path(self):
         return self.prefix
 
-    def save(self, salary: Salary):
-        path = f"{self.path()}/{self.file_name(salary=salary)}"
-        with open(path, "w") as f:
-            json.dump(salary.dumps(), f)
+    def index_path(self) -> str:
+        return f"{self.path()}/{self.INDEX_FILE_NAME}"
+
+    @traced
+    def save(self, salary: Salary) -> str:
+        file_name = self.file_name(salary=salary)
+        path = f"{self.path()}/{file_name}"
+        data = salary.dumps_json()
+        with open(path, "wb") as f:
+            f.write(data)
+        count("SalaryLocal.write.objects")
+        count("SalaryLocal.write.bytes", len(data))
+
+        with _index_lock(self.path()):
+            index = self.load_index()
+            index[file_name] = {"dt": salary.dt(), "company": salary.company}
+            self._write_index(index=index)
+        return path
+
+    @traced
+    def save_many(self, salaries: List[Salary]) -> List[str]:
+        """
+        書き込み後、索引は一度だけ更新する
+        """
+        entry_dict = {}
+        path_list = []
+        for salary in salaries:
+            file_name = self.file_name(salary=salary)
+            path = f"{self.path()}/{file_name}"
+            data = salary.dumps_json()
+            with open(path, "wb") as f:
+                f.write(data)
+            count("SalaryLocal.write.bytes", len(data))
+            entry_dict[file_name] = {"dt": salary.dt(), "company": salary.company}
+            path_list.append(path)
+        with _index_lock(self.path()):
+            index = self.load_index()
+            index.update(entry_dict)
+            self._write_index(index=index)
+        count("SalaryLocal.write.objects", len(path_list))
+        return path_list
 
+    @traced
     def load(self, dt: str) -> List[Salary]:
-        path_candidate = f"{self.path()}/{dt}*"
-        return []
+        dt_prefix = dt.replace("-", "_")
+        file_name_list = sorted(k for k, v in self.load_index().items() if v["dt"].startswith(dt_prefix))
+        return self._load_file_name_list(file_name_list=file_name_list)
+
+    @traced
+    def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        file_name_list = sorted(k for k in self.load_index().keys() if self.in_range(k, start, end, companies))
+        return self._load_file_name_list(file_name_list=file_name_list)
+
+    def _load_file_name_list(self, file_name_list: List[str]) -> List[Salary]:
+        salary_list = []
+        for file_name in file_name_list:
+            with open(f"{self.path()}/{file_name}", "rb") as f:
+                data = f.read()
+            salary_list.append(Salary.loads_json(data))
+            count("SalaryLocal.read.bytes", len(data))
+        count("SalaryLocal.read.objects", len(salary_list))
+        return salary_list
+
+    def load_index(self) -> Dict[str, dict]:
+        """
+        索引を読み込む。存在しない・壊れている・版が異なる場合はディレクトリから作り直す
+
+        Returns:
+            ファイル名 -> {"dt": ..., "company": ...}
+        """
+        if os.path.exists(self.index_path()):
+            try:
+                with open(self.index_path(), "r") as f:
+                    data = json.load(f)
+                if data.get("version") == self.INDEX_VERSION:
+                    return data["files"]
+            except (OSError, ValueError, AttributeError, KeyError):
+                pass
+        return self.rebuild_index()
+
+    def rebuild_index(self) -> Dict[str, dict]:
+        index = {}
+        # まだ保存していない保存先は空として扱い、索引も書かない
+        if not os.path.isdir(self.path()):
+            return index
+        with _index_lock(self.path()):
+            for file_name in sorted(os.listdir(self.path())):
+                if not file_name.endswith(".json") or file_name == self.INDEX_FILE_NAME:
+                    continue
+                dt, company = self.parse_file_name(file_name)
+                index[file_name] = {"dt": dt, "company": company}
+            self._write_index(index=index)
+        return index
+
+    def _write_index(self, index: Dict[str, dict]):
+        # 書き込みごとに別の一時ファイルに書いてから置き換える
+        fd, tmp_path = tempfile.mkstemp(prefix=f"{self.INDEX_FILE_NAME}.", suffix=".tmp", dir=self.path())
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"version": self.INDEX_VERSION, "files": index}, f)
+            os.replace(tmp_path, self.index_path())
+        except BaseException:
+            os.remove(tmp_path)
+            raise
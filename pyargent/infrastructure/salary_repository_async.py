@@ -0,0 +1,132 @@
+import asyncio
+from dataclasses import dataclass, field
+from functools import partial
+from typing import List, Optional
+import weakref
+
+from pyargent.entity.salary import AsyncSalaryRepository, Salary, SalaryRepository
+from pyargent.instrumentation import count, traced
+
+from .s3 import S3Config, async_s3_filesystem
+
+
+@dataclass(frozen=True)
+class AsyncSalaryS3(AsyncSalaryRepository):
+    """
+    s3fsの非同期APIで読み書きする。複数の読み込みは一つのイベントループ上で並行に進む
+    """
+
+    s3_bucket: str
+    prefix: str
+    # 同時に取得するオブジェクトの上限
+    max_concurrency: int = 32
+    config: S3Config = field(default_factory=S3Config)
+    # イベントループごとのS3FileSystem
+    fs_dict: weakref.WeakKeyDictionary = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False, compare=False
+    )
+
+    def path(self) -> str:
+        return f"s3://{self.s3_bucket}/{self.prefix}"
+
+    async def fs(self):
+        """
+        実行中のイベントループに紐づくS3FileSystemを、初回だけ作る
+        """
+        loop = asyncio.get_running_loop()
+        fs = self.fs_dict.get(loop)
+        if fs is None:
+            fs = async_s3_filesystem(self.config)
+            await fs.set_session()
+            self.fs_dict[loop] = fs
+        return fs
+
+    async def close(self):
+        fs = self.fs_dict.pop(asyncio.get_running_loop(), None)
+        if fs is not None and fs._s3 is not None:
+            await fs._s3.close()
+
+    @traced
+    async def save(self, salary: Salary) -> str:
+        path = f"{self.path()}/{self.file_name(salary=salary)}"
+        data = salary.dumps_json()
+        fs = await self.fs()
+        await fs._pipe_file(path, data)
+        count("AsyncSalaryS3.write.objects")
+        count("AsyncSalaryS3.write.bytes", len(data))
+        return path
+
+    @traced
+    async def save_many(self, salaries: List[Salary]) -> List[str]:
+        data_dict = {f"{self.path()}/{self.file_name(salary=salary)}": salary.dumps_json() for salary in salaries}
+        if data_dict:
+            fs = await self.fs()
+            await fs._pipe(data_dict, batch_size=self.max_concurrency)
+        count("AsyncSalaryS3.write.objects", len(data_dict))
+        count("AsyncSalaryS3.write.bytes", sum(map(len, data_dict.values())))
+        return list(data_dict.keys())
+
+    @traced
+    async def load(self, dt: str) -> List[Salary]:
+        fs = await self.fs()
+        path_list = sorted(await fs._glob(f"{self.path()}/{dt.replace('-', '_')}*"))
+        return await self._load_path_list(path_list=path_list)
+
+    @traced
+    async def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        fs = await self.fs()
+        path_list = sorted(await fs._glob(f"{self.path()}/*.json"))
+        path_list = [p for p in path_list if self.in_range(p.rsplit("/", 1)[-1], start, end, companies)]
+        return await self._load_path_list(path_list=path_list)
+
+    async def _load_path_list(self, path_list: List[str]) -> List[Salary]:
+        if not path_list:
+            return []
+        fs = await self.fs()
+        data_dict = await fs._cat(path_list, batch_size=self.max_concurrency)
+        count("AsyncSalaryS3.read.objects", len(path_list))
+        count("AsyncSalaryS3.read.bytes", sum(map(len, data_dict.values())))
+        return [Salary.loads_json(data_dict[path]) for path in path_list]
+
+
+@dataclass(frozen=True)
+class AsyncSalaryAdapter(AsyncSalaryRepository):
+    """
+    同期の`SalaryRepository`を、スレッドで実行して非同期にする。ローカルなど非同期APIのない保存先向け
+
+    保存先がスレッドから並行に書き込めるとは限らないので、`save`・`save_many`は一つずつ実行する。読み込みは並行に進む
+    """
+
+    repository: SalaryRepository
+    # イベントループごとの書き込みのロック
+    write_lock_dict: weakref.WeakKeyDictionary = field(
+        default_factory=weakref.WeakKeyDictionary, init=False, repr=False, compare=False
+    )
+
+    def path(self) -> str:
+        return self.repository.path()
+
+    def _write_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        lock = self.write_lock_dict.get(loop)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.write_lock_dict[loop] = lock
+        return lock
+
+    async def _run(self, func, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(func, **kwargs))
+
+    async def save(self, salary: Salary) -> str:
+        async with self._write_lock():
+            return await self._run(self.repository.save, salary=salary)
+
+    async def save_many(self, salaries: List[Salary]) -> List[str]:
+        async with self._write_lock():
+            return await self._run(self.repository.save_many, salaries=salaries)
+
+    async def load(self, dt: str) -> List[Salary]:
+        return await self._run(self.repository.load, dt=dt)
+
+    async def load_range(self, start: str, end: str, companies: Optional[List[str]] = None) -> List[Salary]:
+        return await self._run(self.repository.load_range, start=start, end=end, companies=companies)
@@ -0,0 +1,213 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+# 計測中の`Recorder`。Noneの間は、計測箇所はこの判定だけで素通りする
+_recorder: Optional["Recorder"] = None
+
+
+@dataclass(eq=False)
+class Span:
+    name: str
+    start_ns: int
+    end_ns: int
+    pid: int
+    tid: int
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+
+@dataclass(eq=False)
+class Recorder:
+    """
+    処理時間（span）と件数（counter）を集める
+
+    Examples:
+        >>> with profile("./trace.json"):
+        ...     OneFile.from_file_path_list(glob.glob("./data/*.csv")).to_chart_df()
+    """
+
+    span_list: List[Span] = field(default_factory=list, init=False, repr=False)
+    counter_dict: Dict[str, int] = field(default_factory=dict, init=False)
+    origin_ns: int = field(default_factory=time.perf_counter_ns, init=False, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+
+    def add_span(self, name: str, start_ns: int, end_ns: int):
+        span = Span(name=name, start_ns=start_ns, end_ns=end_ns, pid=os.getpid(), tid=threading.get_ident())
+        with self.lock:
+            self.span_list.append(span)
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.counter_dict[name] = self.counter_dict.get(name, 0) + value
+
+    def summary(self) -> Dict[str, dict]:
+        """
+        Returns:
+            span名 -> 回数、合計・平均・最大（ミリ秒）
+        """
+        summary = {}
+        for span in self.span_list:
+            entry = summary.setdefault(span.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+            duration_ms = span.duration_ns / 1e6
+            entry["count"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+        for entry in summary.values():
+            entry["mean_ms"] = entry["total_ms"] / entry["count"]
+        return summary
+
+    def to_dict(self) -> dict:
+        return {
+            "summary": self.summary(),
+            "counters": dict(self.counter_dict),
+            "spans": [
+                {
+                    "name": span.name,
+                    "start_us": (span.start_ns - self.origin_ns) / 1e3,
+                    "duration_us": span.duration_ns / 1e3,
+                    "pid": span.pid,
+                    "tid": span.tid,
+                }
+                for span in self.span_list
+            ],
+        }
+
+    def to_chrome_trace(self) -> dict:
+        """
+        chrome://tracing や Perfetto で開ける形式。counterは計測終了時点の値を出す
+        """
+        event_list = [
+            {
+                "name": span.name,
+                "cat": "pyargent",
+                "ph": "X",
+                "ts": (span.start_ns - self.origin_ns) / 1e3,
+                "dur": span.duration_ns / 1e3,
+                "pid": span.pid,
+                "tid": span.tid,
+            }
+            for span in self.span_list
+        ]
+        end_us = (time.perf_counter_ns() - self.origin_ns) / 1e3
+        event_list.extend(
+            {"name": name, "cat": "pyargent", "ph": "C", "ts": end_us, "pid": os.getpid(), "args": {"value": value}}
+            for name, value in self.counter_dict.items()
+        )
+        return {"traceEvents": event_list, "displayTimeUnit": "ms", "otherData": {"counters": dict(self.counter_dict)}}
+
+    def dump(self, path: str, trace_format: str = "chrome"):
+        """
+        Args:
+            path: 書き出すファイル
+            trace_format: "chrome"（Chrome trace）または "json"（集計とspanの一覧）
+        """
+        if trace_format == "chrome":
+            data = self.to_chrome_trace()
+        elif trace_format == "json":
+            data = self.to_dict()
+        else:
+            raise ValueError(f"trace_format must be 'chrome' or 'json', not {trace_format!r}")
+        with open(path, "w") as f:
+            json.dump(data, f)
+
+
+def get_recorder() -> Optional[Recorder]:
+    return _recorder
+
+
+def set_recorder(recorder: Optional[Recorder]) -> Optional[Recorder]:
+    """
+    計測を始める。Noneで止める
+
+    Returns:
+        それまでの`Recorder`
+    """
+    global _recorder
+    previous, _recorder = _recorder, recorder
+    return previous
+
+
+@contextmanager
+def profile(path: Optional[str] = None, trace_format: str = "chrome") -> Iterator[Recorder]:
+    """
+    ブロック内を計測し、`path`があれば終了時に書き出す
+
+    プロセスプール（`workers`）の中の処理は計測されない
+
+    Examples:
+        >>> with profile("./trace.json") as recorder:
+        ...     salary_list = pa.load_salary_range(start="2021-01", end="2021-12")
+        >>> recorder.counter_dict
+        {'SalaryS3.read.objects': 12, 'SalaryS3.read.bytes': 9876}
+    """
+    recorder = Recorder()
+    previous = set_recorder(recorder)
+    try:
+        yield recorder
+    finally:
+        set_recorder(previous)
+        if path is not None:
+            recorder.dump(path, trace_format=trace_format)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        recorder.add_span(name, start_ns, time.perf_counter_ns())
+
+
+def count(name: str, value: int = 1):
+    recorder = _recorder
+    if recorder is not None:
+        recorder.count(name, value)
+
+
+def traced(func):
+    """
+    関数の処理時間を`__qualname__`のspanとして記録する。計測していない間はそのまま呼ぶ
+    """
+    name = func.__qualname__
+
+    if inspect.iscoroutinefunction(func):
+
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return await func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                recorder.add_span(name, start_ns, time.perf_counter_ns())
+
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        recorder = _recorder
+        if recorder is None:
+            return func(*args, **kwargs)
+        start_ns = time.perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            recorder.add_span(name, start_ns, time.perf_counter_ns())
+
+    return wrapper
@@ -3,6 +3,8 @@ import plotly.express as px
 import plotly.io as pio
 from pyargent import Salary
 
+from data import monthly_salary_df, spend_chart_df
+
 
 def _input_salary():
 
@@ -42,6 +44,34 @@ def _input_salary():
         st.write("not yet")
 
 
+def _salary_monthly():
+    storage = st.sidebar.selectbox("storage", ["local", "parquet", "s3"])
+    prefix = st.sidebar.text_input("prefix", "./salary")
+    s3_bucket = st.sidebar.text_input("s3_bucket") if storage == "s3" else None
+    start = st.sidebar.text_input("start", "2021-01")
+    end = st.sidebar.text_input("end", "2021-12")
+    by_company = st.sidebar.checkbox("by_company")
+
+    # 集計済みの結果はキャッシュから返る
+    df = monthly_salary_df(
+        storage=storage, prefix=prefix, start=start, end=end, s3_bucket=s3_bucket, by_company=by_company
+    )
+    st.write(df)
+    if not by_company:
+        st.write(px.bar(df.reset_index(), x="dt", y=["net_payment", "total_deductions"]))
+
+
+def _spend_monthly():
+    statement_glob = st.sidebar.text_input("statements", "./data/*.csv")
+    rule = st.sidebar.selectbox("rule", ["M", "W", "D"])
+    date_format = {"M": "%Y-%m", "W": "%Y-%m-%d", "D": "%Y-%m-%d"}[rule]
+
+    # 明細が変わらない限り、読み直さない
+    df = spend_chart_df(statement_glob=statement_glob, rule=rule, date_format=date_format)
+    shown_group = st.multiselect("group", list(df.columns), default=list(df.columns))
+    st.write(px.bar(df, y=shown_group))
+
+
 def main():
     # data
     data = px.data.iris()
@@ -51,11 +81,15 @@ def main():
         "menu"
     )
     template = st.sidebar.selectbox(
-        "Template", list(["salary_input", "other"])
+        "Template", list(["salary_input", "salary_monthly", "spend_monthly", "other"])
     )
 
     if template == "salary_input":
         _input_salary()
+    elif template == "salary_monthly":
+        _salary_monthly()
+    elif template == "spend_monthly":
+        _spend_monthly()
     else:
         # body
         st.write(
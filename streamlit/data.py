@@ -0,0 +1,140 @@
+"""
+ダッシュボード用のデータ取得
+
+streamlitは操作のたびにスクリプト全体を再実行するので、明細の読み込みや集計は`st.cache`で保持する。
+キャッシュのキーには元データの指紋（パス・更新時刻・サイズ）を含め、ファイルが変わったときだけ作り直す。
+戻り値は共有されるので、呼び出し側で変更しない。
+"""
+
+import codecs
+import glob
+import os
+from typing import Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from pyargent import py_argent
+from pyargent.entity.credit_card import OneFile, ParseCache, SpendCube
+from pyargent.entity.credit_card.one_row import BYTES_ENCODINGS
+from pyargent.entity.salary.analytics import DEDUCTION_COLUMNS, PAYMENT_COLUMNS, SalaryFrame
+
+# 保持する結果の数と有効期間（秒）
+CACHE_MAX_ENTRIES = 16
+CACHE_TTL = 60 * 60
+
+Fingerprint = Tuple[Tuple[str, int, int], ...]
+
+
+def fingerprint(path_list) -> Fingerprint:
+    """
+    Returns:
+        (パス, 更新時刻[ns], サイズ)の組。ファイルが変わると値も変わる
+    """
+    fingerprint_list = []
+    for path in sorted(path_list):
+        stat = os.stat(path)
+        fingerprint_list.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint_list)
+
+
+def salary_fingerprint(storage: str, prefix: str) -> Fingerprint:
+    """
+    ローカルの保存先はファイルの指紋。S3は一覧の取得に時間がかかるので、`CACHE_TTL`で作り直す
+    """
+    if storage == "s3" or prefix.startswith("s3://"):
+        return ()
+    return fingerprint(p for p in glob.glob(f"{prefix}/**/*", recursive=True) if os.path.isfile(p))
+
+
+@st.cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False, allow_output_mutation=True)
+def _load_spend_cube(source: Fingerprint, encoding: str, parse_cache_dir: Optional[str]) -> SpendCube:
+    parse_cache = ParseCache(cache_dir=parse_cache_dir) if parse_cache_dir is not None else None
+    file_path_list = [path for path, _, _ in source]
+    # バイト列のまま解析できる文字コードだけmmapで読む
+    use_mmap = codecs.lookup(encoding).name in BYTES_ENCODINGS
+    one_file = OneFile.from_file_path_list(
+        file_path_list, encoding=encoding, keep_raw_text=False, parse_cache=parse_cache, use_mmap=use_mmap
+    )
+    return one_file.spend_cube()
+
+
+@st.cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False, allow_output_mutation=True)
+def _spend_chart_df(
+    source: Fingerprint, encoding: str, parse_cache_dir: Optional[str], rule: str, date_format: str
+) -> pd.DataFrame:
+    spend_cube = _load_spend_cube(source=source, encoding=encoding, parse_cache_dir=parse_cache_dir)
+    return spend_cube.to_chart_df(rule=rule, date_format=date_format)
+
+
+def spend_chart_df(
+    statement_glob: str, encoding="cp932", rule="M", date_format="%Y-%m", parse_cache_dir: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    明細のグループ別支出。明細は指紋が変わったときだけ読み直し、`rule`ごとの集計も保持する
+
+    Args:
+        statement_glob: 明細のcsvのglob
+        encoding: 明細の文字コード
+        rule: 集計の間隔。`resample()`の引数
+        date_format: 行の日付の形式
+        parse_cache_dir: 指定した場合は、変わっていない明細の解析結果を再利用する
+
+    Returns:
+        日付 x グループの支出
+    """
+    source = fingerprint(glob.glob(statement_glob))
+    return _spend_chart_df(
+        source=source, encoding=encoding, parse_cache_dir=parse_cache_dir, rule=rule, date_format=date_format
+    )
+
+
+@st.cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False, allow_output_mutation=True)
+def _load_salary_frame(
+    source: Fingerprint, storage: str, prefix: str, s3_bucket: Optional[str], start: str, end: str
+) -> SalaryFrame:
+    pa = py_argent(storage=storage, prefix=prefix, s3_bucket=s3_bucket)
+    if storage == "parquet":
+        # 集計に使う列だけを読む
+        columns = ["payment_date"] + PAYMENT_COLUMNS + DEDUCTION_COLUMNS
+        return SalaryFrame.from_flat_df(pa.salary_repository.load_frame(start=start, end=end, columns=columns))
+    return SalaryFrame.from_salaries(pa.load_salary_range(start=start, end=end))
+
+
+@st.cache(max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL, show_spinner=False, allow_output_mutation=True)
+def _monthly_salary_df(
+    source: Fingerprint, storage: str, prefix: str, s3_bucket: Optional[str], start: str, end: str, by_company: bool
+) -> pd.DataFrame:
+    salary_frame = _load_salary_frame(
+        source=source, storage=storage, prefix=prefix, s3_bucket=s3_bucket, start=start, end=end
+    )
+    return salary_frame.monthly(by_company=by_company)
+
+
+def monthly_salary_df(
+    storage: str, prefix: str, start: str, end: str, s3_bucket: Optional[str] = None, by_company=False
+) -> pd.DataFrame:
+    """
+    月ごとの総支給額・課税対象額・控除額合計・差引支給額
+
+    Args:
+        storage: "s3"・"local"・"parquet"
+        prefix: 保存先
+        start: YYYY-MM
+        end: YYYY-MM
+        s3_bucket: `storage`が"s3"の場合のバケット
+        by_company: Trueの場合は月・会社ごと
+
+    Returns:
+
+    """
+    source = salary_fingerprint(storage=storage, prefix=prefix)
+    return _monthly_salary_df(
+        source=source,
+        storage=storage,
+        prefix=prefix,
+        s3_bucket=s3_bucket,
+        start=start,
+        end=end,
+        by_company=by_company,
+    )
@@ -0,0 +1,33 @@
+import pytest
+
+from pyargent import async_py_argent, py_argent
+from pyargent.entity.salary import SalaryRepository
+from pyargent.infrastructure import ReadCache, S3Config, SalaryLocal, SalaryS3
+
+
+@pytest.mark.parametrize("storage", ["local", "parquet"])
+@pytest.mark.parametrize(
+    "s3_options", [{"read_cache": ReadCache()}, {"max_concurrency": 4}, {"s3_config": S3Config(), "read_cache": None}]
+)
+def test_s3_options_rejected(tmp_path, storage, s3_options):
+    with pytest.raises(TypeError, match=storage):
+        py_argent(storage=storage, prefix=str(tmp_path), **s3_options)
+    with pytest.raises(TypeError, match=storage):
+        async_py_argent(storage=storage, prefix=str(tmp_path), **s3_options)
+
+
+def test_s3_options(tmp_path):
+    read_cache = ReadCache()
+    pa = py_argent(storage="s3", prefix="salary", s3_bucket="some-bucket", max_concurrency=4, read_cache=read_cache)
+    assert isinstance(pa.salary_repository, SalaryS3)
+    assert pa.salary_repository.max_concurrency == 4
+    assert pa.salary_repository.read_cache is read_cache
+
+    pa = py_argent(storage="local", prefix=str(tmp_path))
+    assert isinstance(pa.salary_repository, SalaryLocal)
+    assert isinstance(pa.salary_repository, SalaryRepository)
+
+
+def test_unknown_storage(tmp_path):
+    with pytest.raises(ValueError):
+        py_argent(storage="ftp", prefix=str(tmp_path), read_cache=ReadCache())
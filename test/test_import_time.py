@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+import pytest
+
+from .conftest import SOURCE_PATH
+
+# pyargentのimportだけでは読み込まない重い依存
+FORBIDDEN_LIST = ["pandas", "numpy", "s3fs", "botocore", "fsspec", "injector"]
+
+
+def imported_modules(module: str) -> set:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SOURCE_PATH,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    # import time: self [us] | cumulative | imported package
+    return {
+        line.rsplit("|", 1)[1].strip()
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:") and "[us]" not in line
+    }
+
+
+@pytest.mark.parametrize(
+    "module", ["pyargent", "pyargent.entity.credit_card", "pyargent.entity.salary", "pyargent.infrastructure"]
+)
+def test_import_is_lazy(module):
+    module_set = imported_modules(module)
+    assert module in module_set
+    assert [name for name in FORBIDDEN_LIST if name in module_set] == []
@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import os
+import random
+from typing import Dict, List
+
+import pandas as pd
+import pytest
+
+from pyargent.entity.credit_card import MerchantGroupCache
+from pyargent.entity.credit_card.merchant_group import group_by_prefix
+
+WORD_LIST = [
+    "AMAZON",
+    "AMAZON MKTPLACE",
+    "AMAZ",
+    "SEVEN",
+    "SEVEN-ELEVEN",
+    "LAWSON",
+    "LAWS",
+    "ab",
+    "",
+    "ＡＢＣ",
+    "アマゾン",
+    "アマゾンマーケット",
+    "セブンーイレブン",
+    "セブン",
+]
+
+
+def descriptions(n: int, seed: int) -> pd.Series:
+    rnd = random.Random(seed)
+    return pd.Series([rnd.choice(WORD_LIST) + str(rnd.randint(0, 99)) * rnd.randint(0, 2) for _ in range(n)])
+
+
+def reference_groups(description_list: List[str]) -> Dict[str, str]:
+    """
+    以前の`OneFile._add_group`: 先頭4文字のハッシュごとに、共通する先頭の文字列を1文字ずつ伸ばして求める
+
+    Returns:
+        description -> group
+    """
+
+    def to_hash(input_str: str) -> str:
+        return hashlib.sha3_256(input_str[:4].encode("cp932")).hexdigest()[:10]
+
+    def get_max_same_string(same_strings_list: List[str]) -> str:
+        max_index = 0
+        for i in range(max(len(s) for s in same_strings_list)):
+            if len({s[: i + 1] for s in same_strings_list}) == 1:
+                max_index = i + 1
+            else:
+                break
+        return same_strings_list[0][:max_index]
+
+    hash_dict: Dict[str, List[str]] = {}
+    for description in dict.fromkeys(description_list):
+        hash_dict.setdefault(to_hash(description), []).append(description)
+    return {d: get_max_same_string(same) for same in hash_dict.values() for d in same}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_labels_match_previous_engine(seed):
+    description = descriptions(1000, seed)
+    expected = reference_groups(description.tolist())
+    assert group_by_prefix(description).tolist() == [expected[d] for d in description]
+
+
+def test_cache_labels_match_previous_engine(tmp_path):
+    batch_list = [descriptions(300, seed) for seed in range(5)]
+    path = str(tmp_path / "merchant_group.json")
+    for i, batch in enumerate(batch_list):
+        # キャッシュがある場合は、これまでに読み込んだすべての明細から求めた場合と同じ
+        expected = reference_groups(pd.concat(batch_list[: i + 1]).tolist())
+        actual = group_by_prefix(batch, group_cache=MerchantGroupCache.load(path))
+        assert actual.tolist() == [expected[d] for d in batch]
+
+
+def test_cache_labels_match_full_history(tmp_path):
+    batch_list = [descriptions(500, seed) for seed in range(5)]
+    path = str(tmp_path / "merchant_group.json")
+    for batch in batch_list:
+        group_by_prefix(batch, group_cache=MerchantGroupCache.load(path))
+
+    # 一度ずつ読み込んだ後の索引は、すべてをまとめて読み込んだ場合と同じ
+    history = pd.concat(batch_list, ignore_index=True)
+    cache = MerchantGroupCache.load(path)
+    assert group_by_prefix(batch_list[0], group_cache=cache).tolist() == group_by_prefix(history)[:500].tolist()
+    assert not cache.updated
+
+
+def test_concurrent_save(tmp_path):
+    path = str(tmp_path / "merchant_group.json")
+
+    def save(seed):
+        cache = MerchantGroupCache.load(path)
+        group_by_prefix(descriptions(200, seed), group_cache=cache)
+        return cache.groups
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        groups_list = list(executor.map(save, range(32)))
+    # 最後に置き換えたものが残り、一時ファイルは残らない
+    assert MerchantGroupCache.load(path).groups in groups_list
+    assert os.listdir(str(tmp_path)) == ["merchant_group.json"]
+
+
+@pytest.mark.parametrize("content", ["", "{", "[]", '{"version": 0}'])
+def test_unreadable_cache_is_empty(tmp_path, content):
+    path = tmp_path / "merchant_group.json"
+    path.write_text(content, encoding="utf-8")
+    cache = MerchantGroupCache.load(str(path))
+    assert cache.groups == {}
+    assert group_by_prefix(pd.Series(["AMAZON1", "AMAZON2"]), group_cache=cache).tolist() == ["AMAZON", "AMAZON"]
+    assert MerchantGroupCache.load(str(path)).groups == {"AMAZ": "AMAZON"}
@@ -0,0 +1,60 @@
+from dataclasses import astuple
+
+import pytest
+
+from pyargent.entity.credit_card import OneFile, RowFilter
+
+# バイト列のまま解析できない行（全角数字・`，`・`．`・空になる項目・見出し）を含む明細
+LINE_LIST = [
+    "利用日,利用店名・商品名,利用金額,支払区分,今回回数,支払金額,備考",
+    "2021/01/05,AMAZON.CO.JP,1000,1,1,1000,",
+    "2021/01/05,アマゾン,1200,1,1,1200,",
+    "２０２１/０１/０６,アマゾン,１５００,１,１,１５００,",
+    "2021/01/06,ＡＢＣ，ＤＥＦ,500,1,1,500,",
+    "2021/01/07,セブン．イレブン,300,1,1,300,",
+    "2021/01/07,セブン－イレブン　新宿店,350,1,1,350,",
+    "2021/01/08,ｱﾏｿﾞﾝ ﾏｰｹｯﾄ,800,1,1,800,",
+    "2021/01/09,　,100,1,1,100,",
+    "2021/01/10,ローソン,200,1,1,200,　",
+    "2021/01/11,ファミリーマート,-150,1,1,-150,返品",
+    "2021/02/01,アマゾン,700,1,1,700,ｺﾒﾝﾄ",
+    "合計,,,,,7250,",
+]
+
+
+@pytest.fixture
+def statement_path(tmp_path):
+    path = tmp_path / "statement.csv"
+    with open(path, "w", encoding="cp932", newline="") as f:
+        f.write("\r\n".join(LINE_LIST) + "\r\n")
+    return str(path)
+
+
+@pytest.mark.parametrize(
+    "row_filter",
+    [
+        None,
+        RowFilter(start="2021-01-06", end="2021-01-09"),
+        RowFilter(groups=("アマゾン",)),
+        RowFilter(start="2021-01", end="2021-01", groups=("セブン",)),
+    ],
+)
+def test_parse_bytes_equals_parse(statement_path, row_filter):
+    expected = OneFile.from_file_path(statement_path, row_filter=row_filter).one_row_list
+    actual = OneFile.from_file_path(statement_path, use_mmap=True, row_filter=row_filter).one_row_list
+    assert actual == expected
+    # `OneRow`の比較はdateとtotal_billingだけなので、すべての項目を比べる
+    assert [astuple(r) for r in actual] == [astuple(r) for r in expected]
+
+
+def test_parse_bytes_rows(statement_path):
+    one_row_list = OneFile.from_file_path(statement_path, use_mmap=True).one_row_list
+    assert [(r.date, r.description, r.total_billing, r.comment) for r in one_row_list] == [
+        ("2021/01/05", "アマゾン", 1200, ""),
+        ("2021/01/06", "アマゾン", 1500, ""),
+        ("2021/01/07", "セブンーイレブン新宿店", 350, ""),
+        ("2021/01/08", "アマゾンマーケット", 800, ""),
+        ("2021/01/10", "ローソン", 200, ""),
+        ("2021/01/11", "ファミリーマート", -150, "返品"),
+        ("2021/02/01", "アマゾン", 700, "コメント"),
+    ]
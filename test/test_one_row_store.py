@@ -0,0 +1,108 @@
+from dataclasses import astuple
+
+import numpy as np
+import pytest
+
+from pyargent.entity.credit_card import OneRow, OneRowStore, ParseCache
+
+
+@pytest.fixture
+def one_row_list():
+    return [
+        OneRow(date="2021/01/05", description="アマゾン", total_billing=1000, count=1, num=1, actual_billing=1000),
+        OneRow(date="2021/01/05", description="ローソン", total_billing=-200, count=2, num=1, actual_billing=-200),
+        OneRow(
+            date="2021/01/06",
+            description="アマゾン",
+            total_billing=3000,
+            count=3,
+            num=2,
+            actual_billing=1500,
+            comment="分割",
+        ),
+    ]
+
+
+def rows(one_row_list) -> list:
+    # `OneRow`の比較はdateとtotal_billingだけなので、すべての項目を比べる
+    return [astuple(r) for r in one_row_list]
+
+
+def assert_aligned(store: OneRowStore):
+    length_set = {len(c) for c in store.int_columns.values()} | {len(c) for c in store.code_columns.values()}
+    assert length_set == {len(store)}
+
+
+def test_list_api(one_row_list):
+    store = OneRowStore(one_row_list)
+    assert len(store) == 3
+    assert rows(store) == rows(one_row_list)
+    assert astuple(store[-1]) == astuple(one_row_list[-1])
+    with pytest.raises(IndexError):
+        store[3]
+    store.append(one_row_list[0])
+    assert rows(store) == rows(one_row_list + one_row_list[:1])
+
+
+def test_extend_self(one_row_list):
+    store = OneRowStore(one_row_list)
+    store.extend(store)
+    assert_aligned(store)
+    assert rows(store) == rows(one_row_list * 2)
+    store.extend(store)
+    assert rows(store) == rows(one_row_list * 4)
+    assert len(store.strings) == len(set(store.strings))
+
+
+def test_extend_other_strings(one_row_list):
+    other = OneRowStore(
+        [
+            OneRow(date="2021/02/01", description="セブンイレブン", total_billing=500, comment="メモ"),
+            OneRow(date="2021/01/05", description="アマゾン", total_billing=700),
+        ]
+    )
+    store = OneRowStore(one_row_list)
+    store.extend(other)
+    assert_aligned(store)
+    assert rows(store) == rows(one_row_list) + rows(other)
+    # 元の行は変わらない
+    assert rows(other) == rows(list(other))
+    assert len(store.strings) == len(set(store.strings))
+
+    # OneRowStoreでない行も同じ
+    store = OneRowStore(one_row_list)
+    store.extend(list(other))
+    assert rows(store) == rows(one_row_list) + rows(other)
+
+
+def test_slice_and_compress(one_row_list):
+    store = OneRowStore(one_row_list)
+    assert rows(store[1:]) == rows(one_row_list[1:])
+    assert rows(store[::2]) == rows(one_row_list[::2])
+    assert rows(store[5:]) == []
+
+    mask = np.array([True, False, True])
+    compressed = store.compress(mask)
+    assert_aligned(compressed)
+    assert rows(compressed) == rows([one_row_list[0], one_row_list[2]])
+
+    # 切り出したものへの追加は元に影響しない
+    sliced = store[:2]
+    sliced.extend(compressed)
+    assert rows(store) == rows(one_row_list)
+
+
+def test_columns_round_trip(one_row_list):
+    store = OneRowStore(one_row_list)
+    assert rows(OneRowStore.from_columns(store.to_columns())) == rows(one_row_list)
+    assert rows(OneRowStore.from_columns(OneRowStore().to_columns())) == []
+
+
+def test_parse_cache_round_trip(tmp_path, one_row_list):
+    statement_path = tmp_path / "statement.csv"
+    statement_path.write_text("", encoding="cp932")
+    parse_cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+
+    parse_cache.save(str(statement_path), "cp932", OneRowStore(one_row_list))
+    assert rows(parse_cache.load(str(statement_path), "cp932")) == rows(one_row_list)
+    assert parse_cache.date_range(str(statement_path), "cp932") == ("2021/01/05", "2021/01/06")
@@ -0,0 +1,67 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import astuple
+import os
+
+import pytest
+
+from pyargent.entity.credit_card import OneFile, ParseCache, RowFilter
+
+
+@pytest.fixture
+def statement_path_list(tmp_path):
+    path_list = []
+    for month in range(1, 4):
+        path = tmp_path / f"2021{month:02d}.csv"
+        with open(path, "w", encoding="cp932") as f:
+            f.write("利用日,利用店名・商品名,利用金額,支払区分,今回回数,支払金額,備考\n")
+            for day in range(1, 21):
+                f.write(f"2021/{month:02d}/{day:02d},アマゾン{day % 3},{day * 100},1,1,{day * 100},メモ{day % 2}\n")
+            f.write("合計,,,,,0,\n")
+        path_list.append(str(path))
+    return path_list
+
+
+def rows(one_file: OneFile) -> list:
+    return [astuple(r) for r in one_file.one_row_list]
+
+
+def test_round_trip(tmp_path, statement_path_list):
+    parse_cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    expected = OneFile.from_file_path_list(statement_path_list)
+    assert rows(OneFile.from_file_path_list(statement_path_list, parse_cache=parse_cache)) == rows(expected)
+    # 2回目はキャッシュから読む
+    assert parse_cache.load(statement_path_list[0], "cp932") is not None
+    assert rows(OneFile.from_file_path_list(statement_path_list, parse_cache=parse_cache)) == rows(expected)
+    assert parse_cache.date_range(statement_path_list[1], "cp932") == ("2021/02/01", "2021/02/20")
+
+
+def test_concurrent_save(tmp_path, statement_path_list):
+    parse_cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    expected = rows(OneFile.from_file_path_list(statement_path_list))
+
+    def load(_):
+        return rows(OneFile.from_file_path_list(statement_path_list, parse_cache=parse_cache))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        result_list = list(executor.map(load, range(32)))
+    assert all(result == expected for result in result_list)
+    # 一時ファイルは残らない
+    assert sorted(os.listdir(parse_cache.cache_dir)) == sorted(
+        os.path.basename(parse_cache.cache_path(p, "cp932")) for p in statement_path_list
+    )
+
+
+@pytest.mark.parametrize("content", [b"", b"PK\x03\x04broken", b"not a zip file"])
+def test_unreadable_entry_is_miss(tmp_path, statement_path_list, content):
+    parse_cache = ParseCache(cache_dir=str(tmp_path / "cache"))
+    OneFile.from_file_path_list(statement_path_list, parse_cache=parse_cache)
+    path = parse_cache.cache_path(statement_path_list[0], "cp932")
+    with open(path, "wb") as f:
+        f.write(content)
+
+    assert parse_cache.load(statement_path_list[0], "cp932") is None
+    assert parse_cache.date_range(statement_path_list[0], "cp932") is None
+    # 読めないエントリは作り直される
+    one_file = OneFile.from_file_path(statement_path_list[0], parse_cache=parse_cache, row_filter=RowFilter())
+    assert rows(one_file) == rows(OneFile.from_file_path(statement_path_list[0]))
+    assert parse_cache.load(statement_path_list[0], "cp932") is not None
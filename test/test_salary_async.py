@@ -0,0 +1,59 @@
+import asyncio
+from dataclasses import dataclass, field
+import threading
+import time
+from typing import List
+
+from pyargent import async_py_argent
+from pyargent.entity.salary import Salary
+from pyargent.infrastructure import AsyncSalaryAdapter, SalaryLocal
+
+from .test_salary_local import salary
+
+
+@dataclass(frozen=True)
+class CountingSalaryLocal(SalaryLocal):
+    """
+    同時に実行中の保存の最大数を数える
+    """
+
+    state: dict = field(default_factory=lambda: {"running": 0, "max_running": 0}, compare=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, compare=False)
+
+    def save(self, salary: Salary) -> str:
+        with self.lock:
+            self.state["running"] += 1
+            self.state["max_running"] = max(self.state["max_running"], self.state["running"])
+        try:
+            time.sleep(0.001)
+            return super().save(salary)
+        finally:
+            with self.lock:
+                self.state["running"] -= 1
+
+    def save_many(self, salaries: List[Salary]) -> List[str]:
+        return [self.save(s) for s in salaries]
+
+
+def test_adapter_serialises_writes(tmp_path):
+    repository = CountingSalaryLocal(prefix=str(tmp_path))
+    adapter = AsyncSalaryAdapter(repository=repository)
+    salary_list = [salary(f"company{c}", f"2021-{m:02d}") for m in range(1, 13) for c in range(3)]
+
+    async def main():
+        await asyncio.gather(*[adapter.save(s) for s in salary_list[:24]], adapter.save_many(salary_list[24:]))
+        return await adapter.load_range(start="2021-01", end="2021-12")
+
+    assert len(asyncio.run(main())) == 36
+    assert repository.state["max_running"] == 1
+
+
+def test_async_local_concurrent_save(tmp_path):
+    pa = async_py_argent(storage="local", prefix=str(tmp_path))
+    salary_list = [salary(f"company{c}", f"{2000 + m // 12}-{m % 12 + 1:02d}") for m in range(30) for c in range(4)]
+
+    async def main():
+        await asyncio.gather(*[pa.save_salary(s) for s in salary_list])
+        return await pa.load_salary_range(start="2000-01", end="2002-12")
+
+    assert len(asyncio.run(main())) == 120
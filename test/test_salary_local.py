@@ -0,0 +1,98 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+
+import pytest
+
+from pyargent.entity.salary import Salary
+from pyargent.infrastructure import SalaryLocal
+
+
+@pytest.fixture
+def salary_local(tmp_path):
+    return SalaryLocal(prefix=str(tmp_path))
+
+
+def salary(company: str, month: str) -> Salary:
+    return Salary.of(
+        company=company,
+        payment_date=f"{month}-25",
+        calc_start_date=f"{month}-01",
+        calc_end_date=f"{month}-28",
+        basic_payment=300_000,
+        overtime_fee=10_000,
+        static_overtime_fee=0,
+        commuting_fee=5_000,
+        additional_allowance=0,
+        health_insurance=15_000,
+        nursing_insurance=0,
+        welfare_pension=30_000,
+        pension_fund=0,
+        employment_insurance=1_000,
+        income_tax=8_000,
+        inhabitant_tax=10_000,
+        year_end_tax_adjustment=0,
+    )
+
+
+def test_load_missing_prefix(tmp_path):
+    salary_local = SalaryLocal(prefix=str(tmp_path / "salary"))
+    assert salary_local.load("2021-01") == []
+    assert salary_local.load_range(start="2021-01", end="2021-12") == []
+    # 読み込みでは保存先も索引も作らない
+    assert not os.path.exists(salary_local.path())
+
+
+def test_save_and_load(salary_local):
+    s = salary("a", "2021-01")
+    path = salary_local.save(s)
+    assert path == f"{salary_local.path()}/2021_01_a.json"
+    assert salary_local.load("2021-01") == [s]
+    assert salary_local.load("2021-02") == []
+
+
+def test_save_many_and_load_range_with_companies(salary_local):
+    salary_list = [salary(company, f"2021-{m:02d}") for m in range(1, 7) for company in ["c", "b", "a"]]
+    assert len(salary_local.save_many(salary_list)) == 18
+
+    assert [(s.dt(), s.company) for s in salary_local.load("2021-03")] == [
+        ("2021_03", "a"),
+        ("2021_03", "b"),
+        ("2021_03", "c"),
+    ]
+    salary_list = salary_local.load_range(start="2021-02", end="2021-04", companies=["a", "c"])
+    assert [(s.dt(), s.company) for s in salary_list] == [
+        (f"2021_{m:02d}", company) for m in range(2, 5) for company in ["a", "c"]
+    ]
+
+
+@pytest.mark.parametrize("index_text", [None, "", "{", '{"version": 1}', '{"version": 0, "files": {}}', "[]"])
+def test_rebuild_index(salary_local, index_text):
+    salary_local.save_many([salary("a", f"2021-{m:02d}") for m in range(1, 4)])
+    # 索引が消えた・壊れた・古い場合は、ディレクトリから作り直す
+    if index_text is None:
+        os.remove(salary_local.index_path())
+    else:
+        with open(salary_local.index_path(), "w") as f:
+            f.write(index_text)
+
+    assert [s.dt() for s in salary_local.load_range(start="2021-01", end="2021-12")] == [
+        "2021_01",
+        "2021_02",
+        "2021_03",
+    ]
+    with open(salary_local.index_path(), "r") as f:
+        assert sorted(json.load(f)["files"]) == ["2021_01_a.json", "2021_02_a.json", "2021_03_a.json"]
+
+
+def test_concurrent_save(salary_local):
+    salary_list = [salary(f"company{c}", f"{2000 + m // 12}-{m % 12 + 1:02d}") for m in range(30) for c in range(4)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        path_list = list(executor.map(salary_local.save, salary_list))
+    assert len(set(path_list)) == 120
+
+    # すべての給与が索引にあり、一時ファイルは残らない
+    assert len(salary_local.load_range(start="2000-01", end="2002-12")) == 120
+    assert sorted(os.listdir(salary_local.path())) == sorted(
+        [SalaryLocal.INDEX_FILE_NAME] + [os.path.basename(p) for p in path_list]
+    )
@@ -0,0 +1,130 @@
+import os
+import socket
+
+import pytest
+
+from pyargent.entity.salary import Salary
+from pyargent.infrastructure import ReadCache, SalaryS3
+from pyargent.infrastructure.s3 import s3_filesystem
+from pyargent.instrumentation import profile
+
+moto_server = pytest.importorskip("moto.server")
+
+S3_BUCKET = "pyargent-test"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    # S3の代わりにmotoのサーバーを立てる
+    port = free_port()
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=port)
+    server.start()
+    endpoint = f"http://127.0.0.1:{port}"
+    environ = {
+        "AWS_ENDPOINT_URL": endpoint,
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "AWS_DEFAULT_REGION": "us-east-1",
+    }
+    previous = {key: os.environ.get(key) for key in environ}
+    os.environ.update(environ)
+    s3_filesystem.cache_clear()
+    try:
+        s3_filesystem(SalaryS3(s3_bucket=S3_BUCKET, prefix="").config).mkdir(S3_BUCKET)
+        yield endpoint
+    finally:
+        s3_filesystem.cache_clear()
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+        server.stop()
+
+
+@pytest.fixture
+def salary_s3(s3_endpoint, request):
+    # テストごとに別のprefixに保存する
+    return SalaryS3(s3_bucket=S3_BUCKET, prefix=request.node.name, max_concurrency=4)
+
+
+def salary(company: str, month: str) -> Salary:
+    return Salary.of(
+        company=company,
+        payment_date=f"{month}-25",
+        calc_start_date=f"{month}-01",
+        calc_end_date=f"{month}-28",
+        basic_payment=300_000,
+        overtime_fee=10_000,
+        static_overtime_fee=0,
+        commuting_fee=5_000,
+        additional_allowance=0,
+        health_insurance=15_000,
+        nursing_insurance=0,
+        welfare_pension=30_000,
+        pension_fund=0,
+        employment_insurance=1_000,
+        income_tax=8_000,
+        inhabitant_tax=10_000,
+        year_end_tax_adjustment=0,
+    )
+
+
+def test_save_and_load(salary_s3):
+    s = salary("a", "2021-01")
+    path = salary_s3.save(s)
+    assert path == f"s3://{S3_BUCKET}/{salary_s3.prefix}/2021_01_a.json"
+    assert salary_s3.load("2021-01") == [s]
+    assert salary_s3.load("2021-02") == []
+
+
+def test_save_many_and_load_order(salary_s3):
+    salary_list = [salary(company, f"2021-{m:02d}") for m in range(1, 13) for company in ["b", "a"]]
+    path_list = salary_s3.save_many(salary_list)
+    assert len(path_list) == 24
+
+    # ファイル名の順に並ぶ
+    assert [(s.dt(), s.company) for s in salary_s3.load("2021-03")] == [("2021_03", "a"), ("2021_03", "b")]
+    assert [s.dt() for s in salary_s3.load("2021")] == sorted(s.dt() for s in salary_list)
+
+
+def test_load_range_with_companies(salary_s3):
+    salary_s3.save_many([salary(company, f"2021-{m:02d}") for m in range(1, 7) for company in ["a", "b", "c"]])
+
+    salary_list = salary_s3.load_range(start="2021-02", end="2021-04")
+    assert [(s.dt(), s.company) for s in salary_list] == [
+        (f"2021_{m:02d}", company) for m in range(2, 5) for company in ["a", "b", "c"]
+    ]
+
+    salary_list = salary_s3.load_range(start="2021-02", end="2021-04", companies=["a", "c"])
+    assert [(s.dt(), s.company) for s in salary_list] == [
+        (f"2021_{m:02d}", company) for m in range(2, 5) for company in ["a", "c"]
+    ]
+
+
+def test_read_cache_hit(s3_endpoint):
+    salary_s3 = SalaryS3(s3_bucket=S3_BUCKET, prefix="test_read_cache_hit", read_cache=ReadCache())
+    salary_s3.save_many([salary("a", f"2021-{m:02d}") for m in range(1, 4)])
+
+    with profile() as recorder:
+        first = salary_s3.load_range(start="2021-01", end="2021-03")
+    assert recorder.counter_dict["SalaryS3.read.objects"] == 3
+
+    # 2回目は一覧も給与もキャッシュから返し、S3から取得しない
+    with profile() as recorder:
+        second = salary_s3.load_range(start="2021-01", end="2021-03")
+    assert second == first
+    assert recorder.counter_dict.get("SalaryS3.read.objects", 0) == 0
+    assert recorder.counter_dict["SalaryS3.read_cache.hit"] == 3
+
+    # 保存するとキャッシュは破棄される
+    salary_s3.save(salary("a", "2021-04"))
+    with profile() as recorder:
+        assert len(salary_s3.load_range(start="2021-01", end="2021-04")) == 4
+    assert recorder.counter_dict["SalaryS3.read.objects"] == 4
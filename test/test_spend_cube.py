@@ -0,0 +1,94 @@
+import random
+
+import pandas as pd
+import pytest
+
+from pyargent.entity.credit_card import OneFile, OneRow, OneRowStore
+from pyargent.entity.credit_card.merchant_group import group_by_prefix
+
+
+def one_rows(month: int, n: int, seed: int) -> list:
+    rnd = random.Random(seed)
+    return [
+        OneRow(
+            date=f"2021/{month:02d}/{rnd.randint(1, 28):02d}",
+            description=rnd.choice(["アマゾン", "アマゾンマーケット", "セブンイレブン", "ローソン"]) + str(rnd.randint(0, 3)),
+            total_billing=rnd.randint(100, 10_000),
+            actual_billing=rnd.randint(100, 10_000),
+        )
+        for _ in range(n)
+    ]
+
+
+def reference_chart_df(one_row_list, rule="M", date_format="%Y-%m") -> pd.DataFrame:
+    """
+    `SpendCube`を使わずに、すべての行から集計する
+    """
+    df = pd.DataFrame(
+        {"date": [r.date for r in one_row_list], "actual_billing": [r.actual_billing for r in one_row_list]}
+    )
+    df["group"] = group_by_prefix(pd.Series([r.description for r in one_row_list]))
+    df["date"] = pd.to_datetime(df["date"], format=OneRow.DATE_FORMAT)
+    df = df.pivot_table(index="date", columns="group", values="actual_billing", aggfunc="sum", fill_value=0)
+    df = df.resample(rule=rule).sum()
+    df.index = df.index.strftime(date_format)
+    return df
+
+
+def assert_chart_equal(actual: pd.DataFrame, expected: pd.DataFrame):
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_names=False)
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_to_chart_df():
+    one_row_list = one_rows(1, 200, 0) + one_rows(2, 200, 1)
+    assert_chart_equal(OneFile(one_row_list=one_row_list).to_chart_df(), reference_chart_df(one_row_list))
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_replaced_one_row_list():
+    one_file = OneFile(one_row_list=one_rows(1, 100, 0))
+    assert one_file.to_chart_df().index.tolist() == ["2021-01"]
+
+    # 同じ行数の別の行に置き換えても、古い集計を返さない
+    one_row_list = one_rows(2, 100, 1)
+    one_file.one_row_list = OneRowStore(one_row_list)
+    assert_chart_equal(one_file.to_chart_df(), reference_chart_df(one_row_list))
+
+    # 行数の多い別の行に置き換えても、古い集計に足さない
+    one_row_list = one_rows(3, 150, 2)
+    one_file.one_row_list = OneRowStore(one_row_list)
+    assert_chart_equal(one_file.to_chart_df(), reference_chart_df(one_row_list))
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+def test_extend_equals_rebuild():
+    one_file = OneFile(one_row_list=one_rows(1, 100, 0))
+    one_file.to_chart_df()
+    one_file.extend(OneFile(one_row_list=one_rows(2, 100, 1)))
+    one_file.extend(OneFile(one_row_list=one_rows(2, 50, 2)))
+    one_file.extend(one_file)
+
+    expected = OneFile(one_row_list=one_file.one_row_list[:]).to_chart_df()
+    assert_chart_equal(one_file.to_chart_df(), expected)
+    assert_chart_equal(one_file.to_chart_df(), reference_chart_df(list(one_file.one_row_list)))
+    assert_chart_equal(
+        one_file.to_chart_df(rule="D", date_format="%m/%d"),
+        reference_chart_df(list(one_file.one_row_list), rule="D", date_format="%m/%d"),
+    )
+
+
+@pytest.mark.filterwarnings("ignore::FutureWarning")
+@pytest.mark.parametrize("batch_size", [1, 37, 100_000])
+def test_stream_to_chart_df(tmp_path, batch_size):
+    path_list = []
+    for month in range(1, 4):
+        path = tmp_path / f"2021{month:02d}.csv"
+        with open(path, "w", encoding="cp932") as f:
+            for r in one_rows(month, 80, month):
+                f.write(f"{r.date},{r.description},{r.total_billing},1,1,{r.actual_billing},\n")
+        path_list.append(str(path))
+
+    expected = OneFile.from_file_path_list(path_list).to_chart_df()
+    actual = OneFile.stream_to_chart_df(OneFile.iter_file_path_list(path_list), batch_size=batch_size)
+    assert_chart_equal(actual, expected)